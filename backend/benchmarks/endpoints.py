@@ -0,0 +1,334 @@
+"""
+Endpoint benchmark suite — latency and throughput of the hot API paths, gated
+against a stored baseline.
+
+Drives the real FastAPI `app` from main.py in-process over httpx's ASGI
+transport, so no server or network is involved. The dataset comes from
+generate_data.py at the requested size. It is cached under --data-dir and
+copied fresh for every run, so write scenarios never skew later runs.
+
+For each scenario (feed, following_feed, user_posts, profile, search,
+like_toggle, comment_add, login) it records p50/p95/p99 latency and
+requests/sec. Results are written as JSON and compared with the baseline. The
+run exits non-zero when a scenario's p95 rises, or its throughput falls, by
+more than --threshold percent.
+
+Usage (from backend/ with venv activated):
+    python benchmarks/endpoints.py                          # run and compare to baseline.json
+    python benchmarks/endpoints.py --update-baseline        # record a new baseline
+    python benchmarks/endpoints.py --users 20000 --posts 200000 --requests 500
+    python benchmarks/endpoints.py --only feed search --threshold 10 --output run.json
+
+Baselines are machine-specific: record one on the machine that runs the gate.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+PASSWORD = "password123"
+
+
+@dataclass
+class Context:
+    first_post: int
+    last_post: int
+    viewers: list[dict[str, str]]  # auth headers
+    usernames: list[str]
+    search_terms: list[str]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    request: Callable[[httpx.AsyncClient, Context, random.Random], Awaitable[httpx.Response]]
+    # Fraction of --requests to issue; login is bcrypt-bound and would dominate the run
+    share: float = 1.0
+
+
+def _viewer(ctx: Context, rng: random.Random) -> dict[str, str]:
+    return rng.choice(ctx.viewers)
+
+
+def _post_id(ctx: Context, rng: random.Random) -> int:
+    return rng.randint(ctx.first_post, ctx.last_post)
+
+
+def _popular_username(ctx: Context, rng: random.Random) -> str:
+    # Low ids are the heavily followed, prolific accounts in generated data
+    return ctx.usernames[int(len(ctx.usernames) * rng.random() ** 2)]
+
+
+SCENARIOS = [
+    Scenario("feed", lambda c, ctx, rng: c.get(
+        "/posts/feed", params={"limit": 20}, headers=_viewer(ctx, rng))),
+    Scenario("following_feed", lambda c, ctx, rng: c.get(
+        "/posts/feed", params={"limit": 20, "following": "true"}, headers=_viewer(ctx, rng))),
+    Scenario("user_posts", lambda c, ctx, rng: c.get(
+        f"/posts/user/{_popular_username(ctx, rng)}", params={"limit": 20}, headers=_viewer(ctx, rng))),
+    Scenario("profile", lambda c, ctx, rng: c.get(
+        f"/users/{_popular_username(ctx, rng)}", headers=_viewer(ctx, rng))),
+    Scenario("search", lambda c, ctx, rng: c.get(
+        "/users/search", params={"q": rng.choice(ctx.search_terms)}, headers=_viewer(ctx, rng))),
+    Scenario("like_toggle", lambda c, ctx, rng: c.post(
+        f"/posts/{_post_id(ctx, rng)}/like", headers=_viewer(ctx, rng))),
+    Scenario("comment_add", lambda c, ctx, rng: c.post(
+        f"/posts/{_post_id(ctx, rng)}/comments", json={"content": "benchmark comment"},
+        headers=_viewer(ctx, rng))),
+    Scenario("login", lambda c, ctx, rng: c.post(
+        "/auth/login", json={"username": rng.choice(ctx.usernames), "password": PASSWORD}), share=0.1),
+]
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def _run_scenario(
+    client: httpx.AsyncClient,
+    ctx: Context,
+    scenario: Scenario,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+    seed: int,
+) -> dict:
+    rng = random.Random(f"{seed}:{scenario.name}")
+    for _ in range(warmup):
+        await scenario.request(client, ctx, rng)
+
+    total = max(1, int(requests * scenario.share))
+    remaining = iter(range(total))
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            res = await scenario.request(client, ctx, rng)
+            if res.is_success:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(min(concurrency, total))])
+    elapsed = time.perf_counter() - started
+
+    if not latencies:
+        return {"requests": total, "errors": errors, "rps": 0.0}
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def _prepare_dataset(args, workdir: Path) -> Path:
+    """Generate (or reuse) the dataset and return a private working copy of it."""
+    data_dir = Path(args.data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    pristine = data_dir / f"bench_u{args.users}_p{args.posts}_s{args.seed}.db"
+    if not pristine.exists():
+        print(f"Generating dataset {pristine.name} (cached for later runs)...")
+        building = pristine.with_suffix(".building")
+        for stale in data_dir.glob(f"{building.name}*"):
+            stale.unlink()
+        _generate(args, building)
+        os.rename(building, pristine)
+
+    working = workdir / "bench.db"
+    shutil.copyfile(pristine, working)
+    return working
+
+
+def _generate(args, database: Path) -> None:
+    # Separate processes: the app reads DATABASE_URL once, at import
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{database}"}
+    generate = [
+        sys.executable, "generate_data.py",
+        "--users", str(args.users),
+        "--posts", str(args.posts),
+        "--follows", str(args.follows),
+        "--seed", str(args.seed),
+        "--password", PASSWORD,
+    ]
+    subprocess.run(generate, cwd=BACKEND_DIR, env=env, check=True)
+    subprocess.run([sys.executable, "rebuild_timelines.py"], cwd=BACKEND_DIR, env=env, check=True)
+
+
+async def _context(seed: int) -> Context:
+    from sqlalchemy import func, select
+
+    from core.security import create_access_token
+    from database import AsyncSessionLocal
+    from models.post import Post
+    from models.user import User
+
+    async with AsyncSessionLocal() as db:
+        users = (await db.execute(select(User.id, User.username).order_by(User.id))).all()
+        first_post, last_post = (await db.execute(select(func.min(Post.id), func.max(Post.id)))).one()
+    if not users or first_post is None:
+        raise SystemExit("Dataset has no users or posts")
+
+    rng = random.Random(seed)
+    viewers = rng.sample(users, min(20, len(users)))
+    names = [u.username for u in users]
+    return Context(
+        first_post=first_post,
+        last_post=last_post,
+        viewers=[{"Authorization": f"Bearer {create_access_token(v.id)}"} for v in viewers],
+        usernames=names,
+        search_terms=["ana", "leo", "kim", "maya pa", "load1", "load12", "zhang", "o"],
+    )
+
+
+async def _run(args) -> dict:
+    from main import app
+
+    await app.router.startup()
+    try:
+        ctx = await _context(args.seed)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            results = {}
+            for scenario in SCENARIOS:
+                if args.only and scenario.name not in args.only:
+                    continue
+                stats = await _run_scenario(
+                    client, ctx, scenario, args.requests, args.concurrency, args.warmup, args.seed
+                )
+                results[scenario.name] = stats
+                _print_row(scenario.name, stats)
+    finally:
+        await app.router.shutdown()
+
+    return {
+        "meta": {
+            "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "users": args.users,
+            "posts": args.posts,
+            "seed": args.seed,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+            "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPU",
+        },
+        "scenarios": results,
+    }
+
+
+def _print_row(name: str, stats: dict) -> None:
+    if not stats.get("rps"):
+        print(f"  {name:<15} all {stats['requests']} requests failed")
+        return
+    print(
+        f"  {name:<15} {stats['rps']:>8.1f} req/s  p50 {stats['p50_ms']:>8.2f} ms  "
+        f"p95 {stats['p95_ms']:>8.2f} ms  p99 {stats['p99_ms']:>8.2f} ms  errors {stats['errors']}"
+    )
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Return one message per scenario that regressed beyond `threshold` percent."""
+    regressions = []
+    limit = threshold / 100
+    for name, base in baseline["scenarios"].items():
+        now = current["scenarios"].get(name)
+        if now is None or not base.get("rps"):
+            continue
+        if not now.get("rps"):
+            regressions.append(f"{name}: every request failed")
+            continue
+        p95_change = now["p95_ms"] / base["p95_ms"] - 1
+        rps_change = now["rps"] / base["rps"] - 1
+        if p95_change > limit:
+            regressions.append(f"{name}: p95 {base['p95_ms']} -> {now['p95_ms']} ms ({p95_change:+.0%})")
+        if rps_change < -limit:
+            regressions.append(f"{name}: throughput {base['rps']} -> {now['rps']} req/s ({rps_change:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--posts", type=int, default=20_000)
+    parser.add_argument("--follows", type=float, default=20.0, help="mean accounts followed per user")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=300, help="measured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=10, help="unmeasured requests per scenario")
+    parser.add_argument("--only", nargs="+", metavar="SCENARIO", choices=[s.name for s in SCENARIOS])
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "cadrebook-bench"))
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=20.0, help="allowed regression, percent")
+    parser.add_argument("--output", type=Path, help="write this run's results as JSON")
+    parser.add_argument("--update-baseline", action="store_true", help="save this run as the new baseline")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(BACKEND_DIR))
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+    with tempfile.TemporaryDirectory(prefix="cadrebook-bench-") as workdir:
+        database = _prepare_dataset(args, Path(workdir))
+        os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+        # The app's startup and shutdown write these; keep them out of backend/
+        os.environ["TRENDING_SNAPSHOT_PATH"] = os.path.join(workdir, "trending.json")
+        os.environ["PROFILE_DIR"] = os.path.join(workdir, "profiles")
+        os.environ["EVENT_SOCKET_DIR"] = os.path.join(workdir, "events")
+        print(f"Benchmarking {args.users:,} users / {args.posts:,} posts, "
+              f"{args.requests} requests per scenario at concurrency {args.concurrency}")
+        current = asyncio.run(_run(args))
+
+    if args.output:
+        args.output.write_text(json.dumps(current, indent=2) + "\n")
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(current, indent=2) + "\n")
+        print(f"\nBaseline saved to {args.baseline}")
+        return
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to record one.")
+        return
+
+    baseline = json.loads(args.baseline.read_text())
+    mismatched = [
+        key for key in ("users", "posts", "seed", "requests", "concurrency")
+        if baseline["meta"].get(key) != current["meta"][key]
+    ]
+    if mismatched:
+        print(f"\nWarning: baseline was recorded with different {', '.join(mismatched)}; "
+              "the comparison is not like-for-like.")
+    regressions = compare(current, baseline, args.threshold)
+    if regressions:
+        print(f"\nRegressed by more than {args.threshold:g}%:")
+        for message in regressions:
+            print(f"  {message}")
+        sys.exit(1)
+    print(f"\nNo scenario regressed by more than {args.threshold:g}% against {args.baseline.name}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Feed throughput benchmark — requests/sec for GET /posts/feed under concurrent load.
+
+Drives a running server over HTTP so the same script can measure any revision
+of the backend. To compare the sync and async stacks, start uvicorn on each
+revision in turn and point the benchmark at it:
+
+    uvicorn main:app --port 8000                     # in backend/, revision A
+    python benchmarks/feed_throughput.py --clients 200 --duration 15
+
+Registers a throwaway user (and a handful of posts if the feed is empty),
+then runs `--clients` concurrent loops that fetch the feed back-to-back.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+
+import httpx
+
+
+async def _prepare(client: httpx.AsyncClient, posts: int) -> dict[str, str]:
+    name = f"bench_{uuid.uuid4().hex[:12]}"
+    res = await client.post(
+        "/auth/register",
+        json={"username": name, "email": f"{name}@bench.dev", "password": "benchmark-pw"},
+    )
+    res.raise_for_status()
+    headers = {"Authorization": f"Bearer {res.json()['access_token']}"}
+    for i in range(posts):
+        (await client.post("/posts", json={"content": f"benchmark post {i}"}, headers=headers)).raise_for_status()
+    return headers
+
+
+async def _worker(
+    client: httpx.AsyncClient,
+    headers: dict[str, str],
+    deadline: float,
+    latencies: list[float],
+    errors: list[int],
+) -> None:
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            res = await client.get("/posts/feed", params={"limit": 20}, headers=headers)
+            ok = res.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        if ok:
+            latencies.append(time.perf_counter() - start)
+        else:
+            errors.append(1)
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run(base_url: str, clients: int, duration: float, warmup: float, posts: int) -> None:
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        headers = await _prepare(client, posts)
+
+        if warmup > 0:
+            await asyncio.gather(*[
+                _worker(client, headers, time.perf_counter() + warmup, [], [])
+                for _ in range(clients)
+            ])
+
+        latencies: list[float] = []
+        errors: list[int] = []
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*[
+            _worker(client, headers, deadline, latencies, errors) for _ in range(clients)
+        ])
+        elapsed = time.perf_counter() - started
+
+    if not latencies:
+        print("No successful requests — is the server running?", file=sys.stderr)
+        sys.exit(1)
+
+    latencies.sort()
+    print(f"GET /posts/feed  clients={clients}  duration={elapsed:.1f}s")
+    print(f"  requests/sec : {len(latencies) / elapsed:10.1f}")
+    print(f"  ok / errors  : {len(latencies)} / {len(errors)}")
+    print(f"  mean         : {statistics.fmean(latencies) * 1000:8.1f} ms")
+    for pct in (50, 95, 99):
+        print(f"  p{pct:<11} : {_percentile(latencies, pct) * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=15.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="unmeasured seconds before the run")
+    parser.add_argument("--posts", type=int, default=20, help="posts to create for the bench user")
+    args = parser.parse_args()
+    asyncio.run(run(args.base_url, args.clients, args.duration, args.warmup, args.posts))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+User search ranking check — every match is reachable, in rank order.
+
+Builds a throwaway SQLite database with 600 users named ana0000…ana0599 and,
+inserted last, an exact `ana` with 99,999 followers. Then it searches for
+"ana" and follows next_cursor to the end. The run fails unless:
+
+  - `ana` is the first result on the first page
+  - the pages return all 601 users exactly once
+  - they come in rank order: exact username, then username prefix, then
+    other matches, most followed first within each tier
+
+Search once ranked an arbitrary 500 FTS matches in rowid order, which dropped
+the exact match and ended pagination at 500 results. The check also prints the
+per-page latency. It runs in-process; DATABASE_URL and SECRET_KEY are set for
+it:
+
+    python benchmarks/search_ranking.py              # from backend/
+    python benchmarks/search_ranking.py --users 5000 --limit 50
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _populate(count: int) -> None:
+    from sqlalchemy import insert
+
+    import models  # noqa: F401 — registers all ORM models
+    from database import Base, engine
+    from models.user import User
+
+    Base.metadata.create_all(bind=engine)
+    rows = [
+        {
+            "username": f"ana{i:04d}",
+            "email": f"ana{i:04d}@check.cadrebook.dev",
+            "hashed_password": "x",
+            "display_name": f"Ana {i}",
+            "followers_count": (i * 37) % 101,
+        }
+        for i in range(count)
+    ]
+    rows.append({
+        "username": "ana",
+        "email": "ana@check.cadrebook.dev",
+        "hashed_password": "x",
+        "display_name": "Ana",
+        "followers_count": 99_999,
+    })
+    with engine.begin() as conn:
+        conn.execute(insert(User), rows)
+
+
+async def _search_all(limit: int) -> tuple[list, list[float]]:
+    from database import ReadSessionLocal
+    from services.user_service import search_users
+
+    results, timings, cursor = [], [], None
+    async with ReadSessionLocal() as db:
+        while True:
+            start = time.perf_counter()
+            page = await search_users(db, "ana", cursor=cursor, limit=limit)
+            timings.append(time.perf_counter() - start)
+            results.extend(page.items)
+            if not page.has_more:
+                return results, timings
+            cursor = page.next_cursor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=600, help="ana#### users besides the exact match")
+    parser.add_argument("--limit", type=int, default=20, help="results per page")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="cadrebook-search-") as workdir:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'search.db')}"
+        os.environ.setdefault("SECRET_KEY", "search-check-secret-key")
+        _populate(args.users)
+        results, timings = asyncio.run(_search_all(args.limit))
+
+    usernames = [r.username for r in results]
+    expected = ["ana"] + [
+        r.username for r in sorted(results[1:], key=lambda r: (-r.followers_count, -r.id))
+    ]
+    failures = []
+    if not usernames or usernames[0] != "ana":
+        failures.append(f"first result is {usernames[:1]}, expected the exact match 'ana'")
+    if len(usernames) != args.users + 1 or len(set(usernames)) != len(usernames):
+        failures.append(f"{len(usernames)} results ({len(set(usernames))} distinct), expected {args.users + 1}")
+    elif usernames != expected:
+        failures.append("results are not in (tier, followers_count desc) order")
+
+    timings.sort()
+    print(f"{len(usernames)} results over {len(timings)} pages, "
+          f"median {timings[len(timings) // 2] * 1000:.2f} ms, max {timings[-1] * 1000:.2f} ms per page")
+    if failures:
+        for message in failures:
+            print(f"FAIL: {message}", file=sys.stderr)
+        sys.exit(1)
+    print("OK: exact match first, every match reachable in rank order")
+
+
+if __name__ == "__main__":
+    main()
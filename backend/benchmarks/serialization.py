@@ -0,0 +1,188 @@
+"""
+Serialization microbenchmark — per-item cost of turning feed rows into JSON bytes.
+
+Compares three ways to render a PostPage of 20, 100 and 500 posts:
+
+  fastapi   : the old path. The service builds PostResponse models, FastAPI
+              re-validates them against response_model, runs jsonable_encoder and
+              encodes with json.dumps in JSONResponse
+  construct : models built with model_construct (no validation), rendered by
+              core.responses.ModelResponse
+  direct    : the shipped path. post_service._to_response builds validated models,
+              and ModelResponse has pydantic-core write the bytes
+
+`construct` is here to show why it isn't used: in pydantic v2, model_construct is
+pure Python and costs more per item than validation, which runs in Rust.
+
+A second table sets the shipped nested page against format=normalized, with all
+fields and with a sparse `fields=content,created_at,likes_count`: bytes per page
+and cost per item. Those bodies differ by design, so they aren't compared.
+
+Runs in-process with no server or database. The app's settings still need
+DATABASE_URL and SECRET_KEY, so placeholders are set unless the environment
+provides them; nothing connects. Before timing, it checks that every path
+produces byte-identical bodies:
+
+    python benchmarks/serialization.py              # from backend/
+    python benchmarks/serialization.py --sizes 20 100 500 --repeat 200
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Importing the app reads its settings; only the models and schemas are exercised
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+from core.object_cache import AuthorRecord, PostRecord  # noqa: E402
+from core.responses import ModelResponse  # noqa: E402
+from models.post import Post  # noqa: E402
+from models.user import User  # noqa: E402
+from schemas.post import NORMALIZED_POST_FIELDS, PostAuthor, PostPage, PostResponse  # noqa: E402
+from services.post_service import _normalized_fields, _normalized_page, _to_response  # noqa: E402
+
+RESPONSE_FIELD = create_response_field("Response_feed", PostPage)
+NEXT_CURSOR = "MjAyNC0wMS0wMVQxMjowMDowMHwx"
+
+
+def _make_posts(count: int) -> list[Post]:
+    authors = [
+        User(id=i, username=f"user{i}", display_name=None if i % 3 == 0 else f"Ünïcode Üser {i} 🚀")
+        for i in range(1, 21)
+    ]
+    now = datetime(2024, 1, 1, 12, 0, 0, 123456)
+    posts = []
+    for i in range(count):
+        author = authors[i % len(authors)]
+        post = Post(
+            id=i + 1,
+            user_id=author.id,
+            content=f'Post {i} with "quotes", a \\ backslash, a\ttab and some text. ' * 3,
+            created_at=now - timedelta(minutes=i),
+            updated_at=now - timedelta(minutes=i),
+            likes_count=i * 7,
+            comments_count=i % 13,
+        )
+        post.user = author
+        posts.append(post)
+    return posts
+
+
+def _constructed_page(posts: list[Post], liked: set[int]) -> PostPage:
+    return PostPage.model_construct(
+        items=[
+            PostResponse.model_construct(
+                id=p.id,
+                content=p.content,
+                created_at=p.created_at,
+                updated_at=p.updated_at,
+                likes_count=p.likes_count,
+                comments_count=p.comments_count,
+                liked_by_me=p.id in liked,
+                user_id=p.user_id,
+                author=PostAuthor.model_construct(
+                    id=p.user.id, username=p.user.username, display_name=p.user.display_name
+                ),
+                comment_preview=None,
+            )
+            for p in posts
+        ],
+        next_cursor=NEXT_CURSOR,
+        has_more=True,
+    )
+
+
+def _service_page(posts: list[Post], liked: set[int]) -> PostPage:
+    return PostPage(items=[_to_response(p, p.user, liked) for p in posts], next_cursor=NEXT_CURSOR, has_more=True)
+
+
+def _complete(coro):
+    # serialize_response never suspends for a coroutine endpoint; drive it without
+    # an event loop so loop start-up doesn't count against the fastapi path
+    try:
+        coro.send(None)
+    except StopIteration as done:
+        return done.value
+    raise RuntimeError("serialize_response suspended")
+
+
+def _fastapi(posts: list[Post], liked: set[int]) -> bytes:
+    content = _complete(serialize_response(field=RESPONSE_FIELD, response_content=_service_page(posts, liked)))
+    return JSONResponse(content).body
+
+
+def _construct(posts: list[Post], liked: set[int]) -> bytes:
+    return ModelResponse(_constructed_page(posts, liked)).body
+
+
+def _direct(posts: list[Post], liked: set[int]) -> bytes:
+    return ModelResponse(_service_page(posts, liked)).body
+
+
+PATHS = {"fastapi": _fastapi, "construct": _construct, "direct": _direct}
+
+
+def _normalized(fields: tuple[str, ...]):
+    def render(posts: list[Post], liked: set[int]) -> bytes:
+        entries = [(PostRecord.from_post(p), AuthorRecord.from_user(p.user)) for p in posts]
+        return ModelResponse(_normalized_page(entries, liked, {}, fields, NEXT_CURSOR, True)).body
+    return render
+
+
+FORMATS = {
+    "nested": _direct,
+    "normalized": _normalized(NORMALIZED_POST_FIELDS),
+    "sparse": _normalized(_normalized_fields("normalized", "content,created_at,likes_count")),
+}
+
+
+def _per_item_us(fn, posts: list[Post], liked: set[int], repeat: int) -> float:
+    fn(posts, liked)  # warm caches
+    best = float("inf")
+    # Best of 5 batches damps scheduler noise
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn(posts, liked)
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best / len(posts) * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 100, 500], help="posts per page")
+    parser.add_argument("--repeat", type=int, default=50, help="pages serialized per batch")
+    args = parser.parse_args()
+
+    print(f"{'page size':>9}" + "".join(f"  {name:>12}" for name in PATHS) + "  speedup (fastapi / direct)")
+    for size in args.sizes:
+        posts = _make_posts(size)
+        liked = {p.id for p in posts[::4]}
+        if len({fn(posts, liked) for fn in PATHS.values()}) != 1:
+            print(f"Output differs between paths for a {size}-post page", file=sys.stderr)
+            sys.exit(1)
+        cost = {name: _per_item_us(fn, posts, liked, args.repeat) for name, fn in PATHS.items()}
+        row = "".join(f"  {us:>9.2f} µs" for us in cost.values())
+        print(f"{size:>9}{row}  {cost['fastapi'] / cost['direct']:>5.2f}x")
+
+    print()
+    print(f"{'page size':>9}" + "".join(f"  {name:>20}" for name in FORMATS))
+    for size in args.sizes:
+        posts = _make_posts(size)
+        liked = {p.id for p in posts[::4]}
+        row = "".join(
+            f"  {len(fn(posts, liked)):>7} B {_per_item_us(fn, posts, liked, args.repeat):>6.2f} µs"
+            for fn in FORMATS.values()
+        )
+        print(f"{size:>9}{row}")
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,110 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     database_url: str
+    # Optional read replica; GET requests read from database_url when unset
+    database_read_url: str | None = None
     secret_key: str
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 60
 
+    # Authenticated-principal cache — entries also expire with their token
+    principal_cache_size: int = 10_000
+    principal_cache_ttl_seconds: int = 60
+
+    # Hot post and author records reused across feed pages; a worker sees other workers' edits within the TTL
+    post_cache_max_bytes: int = 32 * 1024 * 1024
+    author_cache_max_bytes: int = 4 * 1024 * 1024
+    object_cache_ttl_seconds: float = 30.0
+
+    # bcrypt runs on its own bounded pool; requests beyond workers + queue get a fast 503
+    password_hash_workers: int = 4
+    password_hash_max_queue: int = 32
+
+    # Admission control: concurrent requests per route class, requests allowed to wait, and how long they wait
+    # before a 503 with Retry-After. /health, /metrics, docs and /events streams are exempt.
+    admission_enabled: bool = True
+    admission_read_limit: int = 32
+    admission_read_queue: int = 256
+    admission_read_timeout_seconds: float = 5.0
+    # Writes share one SQLite connection, so a few at a time keep it busy without a long pool queue
+    admission_write_limit: int = 4
+    admission_write_queue: int = 64
+    admission_write_timeout_seconds: float = 2.0
+    admission_auth_limit: int = 8
+    admission_auth_queue: int = 32
+    admission_auth_timeout_seconds: float = 2.0
+    admission_retry_after_seconds: int = 1
+
+    # Connection pools — SQLite allows one writer at a time, so mutations share a single connection
+    db_write_pool_size: int = 1
+    db_read_pool_size: int = 10
+    db_read_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+
+    # SQLite production profile (applied to every connection)
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_cache_size_kib: int = 64_000
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_busy_timeout_ms: int = 5_000
+
+    # A username-prefix search first looks for matches among this many of the most-followed users
+    search_candidate_limit: int = 2_000
+
+    # Home timelines: authors above this follower count are pulled at read time instead of fanned out
+    timeline_fanout_max_followers: int = 10_000
+    # Recent posts copied into a timeline when its owner follows someone
+    timeline_backfill_limit: int = 500
+
+    # "People you may know": suggestions stored per user by rebuild_suggestions.py and adjusted on follow
+    suggestion_top_k: int = 50
+    # A follow by an account with more followers than this doesn't update its followers' suggestions until the next rebuild
+    suggestion_fanout_max_followers: int = 10_000
+
+    # Ranked feed (sort=ranked): candidates scored per request, score halves every ranked_half_life_hours
+    ranked_candidate_limit: int = 2_000
+    ranked_half_life_hours: float = 12.0
+    # Per-viewer ranking inputs (followed set, author affinity); a viewer's like or follow drops their entry
+    ranked_cache_size: int = 10_000
+    ranked_cache_ttl_seconds: int = 300
+    # The shared pool of popular candidates is recomputed at most this often
+    ranked_popular_ttl_seconds: int = 30
+
+    # Trending posts: count-min sketches over 1h and 24h windows, kept in memory and snapshotted to disk
+    trending_sketch_width: int = 2048
+    trending_sketch_depth: int = 4
+    trending_max_results: int = 50
+    trending_snapshot_path: str = "trending.json"
+    trending_snapshot_seconds: float = 60.0
+    # Bloom filter bits per hour for "this user already liked this post" (24 × 2^20 bits ≈ 3 MB)
+    trending_liker_filter_bits: int = 1 << 20
+
+    # Per-request SQL instrumentation: Server-Timing header plus one JSON log line per request
+    log_level: str = "INFO"
+    sql_instrumentation: bool = True
+    # Statements slower than this are logged with parameters and query plan; 0 disables
+    slow_query_ms: float = 200.0
+    # The same statement shape this many times in one request is flagged as a likely N+1
+    n_plus_one_threshold: int = 5
+
+    # Prometheus text exposition on /metrics (request counts, latency histograms, pool gauges)
+    metrics_enabled: bool = True
+
+    # On-demand profiling of single requests carrying a token from profile_token.py
+    profiling_enabled: bool = False
+    profile_dir: str = "profiles"
+    profile_interval_ms: float = 1.0
+    # At most one profiled request per interval, and each is sampled for at most profile_max_seconds
+    profile_min_interval_seconds: float = 10.0
+    profile_max_seconds: float = 30.0
+
+    # Live updates: "memory" serves a single worker; "unix" shares events between workers on one host
+    event_backend: str = "memory"
+    event_socket_dir: str = "/tmp/cadrebook-events"
+    # Per client: posts + authors watched, and events buffered before a slow client is told to resync
+    event_max_topics: int = 200
+    event_queue_size: int = 256
+    event_heartbeat_seconds: float = 15.0
+
     model_config = {"env_file": ".env"}
 
 
@@ -0,0 +1,136 @@
+import asyncio
+from collections import deque
+
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from config import settings
+from core.exceptions import OverloadedError
+from core.metrics import Counter, Gauge, registry
+
+# Probes, docs and long-lived streams never queue: a stream would hold a slot for its lifetime
+EXEMPT_PATHS = frozenset({"/health", "/metrics", "/docs", "/redoc", "/openapi.json", "/events"})
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class Limiter:
+    """At most `limit` requests at once, up to `max_queue` waiting, each for at most `timeout` seconds.
+
+    Waiters are served first come, first served: a finishing request hands its
+    slot straight to the oldest waiter, so newcomers can't overtake the queue.
+    Everything runs on the event loop, so the counters need no lock.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int, timeout: float):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> str | None:
+        """Take a slot. Returns None on success, or why the request was turned away."""
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return None
+        if len(self._waiters) >= self.max_queue:
+            return "queue_full"
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.timeout)
+        except asyncio.TimeoutError:
+            return "timeout"
+        except asyncio.CancelledError:
+            # The slot may have been handed over just as the client went away
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if waiter.cancelled() and waiter in self._waiters:
+                # Timed out or abandoned; release() may already have skipped past it
+                self._waiters.remove(waiter)
+        return None
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # in_flight stays the same: the slot passes to the waiter
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+
+limiters = {
+    "read": Limiter("read", settings.admission_read_limit, settings.admission_read_queue,
+                    settings.admission_read_timeout_seconds),
+    "write": Limiter("write", settings.admission_write_limit, settings.admission_write_queue,
+                     settings.admission_write_timeout_seconds),
+    "auth": Limiter("auth", settings.admission_auth_limit, settings.admission_auth_queue,
+                    settings.admission_auth_timeout_seconds),
+}
+
+
+def _limiter_samples():
+    for name, limiter in limiters.items():
+        yield (name, "running"), limiter.in_flight
+        yield (name, "queued"), limiter.queued
+
+
+registry.register(Gauge(
+    "admission_requests", "Requests holding or waiting for a slot, by route class.", ("class", "state"),
+    collect=_limiter_samples,
+))
+admission_rejected = registry.register(Counter(
+    "admission_rejected_total", "Requests turned away with 503, by route class and reason.", ("class", "reason"),
+))
+
+
+def route_class(scope: Scope) -> str | None:
+    """`read`, `write` or `auth`; None for requests that bypass admission control."""
+    if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+        return None
+    if scope["path"].startswith("/auth/"):
+        return "auth"
+    return "read" if scope["method"] in READ_METHODS else "write"
+
+
+class AdmissionMiddleware:
+    """Caps concurrent requests per route class and sheds the excess with a fast 503.
+
+    Without it every request is accepted and waits somewhere inside: on the
+    threadpool, a pool checkout (DB_POOL_TIMEOUT) or the single write
+    connection. Under a spike they all time out together. Here each class
+    (`read`, `write`, `auth`) has its own limit, bounded queue and queue
+    deadline, so expensive writes back off while cheap reads keep flowing.
+    Requests that can't get a slot get `503` with `Retry-After`.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        name = route_class(scope)
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = limiters[name]
+        reason = await limiter.acquire()
+        if reason is not None:
+            admission_rejected.inc(name, reason)
+            error = OverloadedError(settings.admission_retry_after_seconds)
+            response = JSONResponse({"detail": error.message}, status_code=error.status_code, headers=error.headers)
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
@@ -0,0 +1,44 @@
+import hashlib
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+from fastapi import Response, status
+from pydantic import BaseModel
+
+from core.responses import ModelResponse
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True, slots=True)
+class Versioned(Generic[T]):
+    """A service result tagged with its ETag.
+
+    `value` is None when the caller's If-None-Match already matches, so the
+    service skipped building the response.
+    """
+
+    etag: str
+    value: T | None = None
+
+
+def make_etag(*parts: object) -> str:
+    """Strong ETag over the columns that decide a response's content."""
+    digest = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    # If-None-Match uses weak comparison, so a W/ prefix from a proxy still matches
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def conditional(result: Versioned[BaseModel | dict]) -> Response:
+    """Router helper: 304 when the client's copy is current, otherwise the value with its ETag."""
+    headers = {"ETag": result.etag, "Cache-Control": "private, no-cache"}
+    if result.value is None:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return ModelResponse(result.value, headers=headers)
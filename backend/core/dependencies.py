@@ -2,40 +2,67 @@ from typing import Optional
 
 from fastapi import Depends
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.exceptions import UnauthorizedError
-from core.security import decode_access_token
-from database import get_db
+from core.principal_cache import UserSnapshot, principal_cache
+from core.security import decode_access_token_claims
+from database import ReadSessionLocal, get_db
 from models.user import User
 
 bearer_scheme = HTTPBearer()
 optional_bearer_scheme = HTTPBearer(auto_error=False)
 
 
-def get_current_user(
+async def _resolve_principal(token: str, db: AsyncSession) -> UserSnapshot | None:
+    """Cached principal for a bearer token; raises ValueError if the token is invalid."""
+    snapshot = principal_cache.get(token)
+    if snapshot is not None:
+        return snapshot
+
+    user_id, token_exp = decode_access_token_claims(token)
+    user = await db.get(User, user_id)
+    if user is None:
+        return None
+    snapshot = UserSnapshot.from_user(user)
+    principal_cache.put(token, snapshot, token_exp)
+    return snapshot
+
+
+async def authenticate_token(token: str) -> UserSnapshot | None:
+    """Principal for a raw token, for transports that can't send an Authorization header.
+
+    Browsers' WebSocket and EventSource APIs only take a URL, so live-update
+    clients pass the token as a query parameter instead.
+    """
+    try:
+        async with ReadSessionLocal() as db:
+            return await _resolve_principal(token, db)
+    except ValueError:
+        return None
+
+
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    db: Session = Depends(get_db),
-) -> User:
+    db: AsyncSession = Depends(get_db),
+) -> UserSnapshot:
     try:
-        user_id = decode_access_token(credentials.credentials)
+        user = await _resolve_principal(credentials.credentials, db)
     except ValueError:
         raise UnauthorizedError()
 
-    user = db.get(User, user_id)
     if user is None:
         raise UnauthorizedError()
     return user
 
 
-def get_optional_current_user(
+async def get_optional_current_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_bearer_scheme),
-    db: Session = Depends(get_db),
-) -> Optional[User]:
+    db: AsyncSession = Depends(get_db),
+) -> Optional[UserSnapshot]:
     if not credentials:
         return None
     try:
-        user_id = decode_access_token(credentials.credentials)
-        return db.get(User, user_id)
+        return await _resolve_principal(credentials.credentials, db)
     except Exception:
         return None
@@ -3,9 +3,10 @@ from fastapi.responses import JSONResponse
 
 
 class AppError(Exception):
-    def __init__(self, message: str, status_code: int = 400):
+    def __init__(self, message: str, status_code: int = 400, headers: dict[str, str] | None = None):
         self.message = message
         self.status_code = status_code
+        self.headers = headers
         super().__init__(message)
 
 
@@ -49,10 +50,44 @@ class CommentNotFoundError(AppError):
         super().__init__("Comment not found", status_code=404)
 
 
+class InvalidCursorError(AppError):
+    def __init__(self):
+        super().__init__("Invalid pagination cursor", status_code=400)
+
+
+class InvalidFieldsError(AppError):
+    def __init__(self, message: str):
+        super().__init__(message, status_code=400)
+
+
+class TooManyTopicsError(AppError):
+    def __init__(self, limit: int):
+        super().__init__(f"Subscribe to at most {limit} posts and authors at once", status_code=400)
+
+
+class PasswordHasherBusyError(AppError):
+    def __init__(self, retry_after: int = 1):
+        super().__init__(
+            "Too many sign-in attempts right now. Please try again in a moment.",
+            status_code=503,
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class OverloadedError(AppError):
+    def __init__(self, retry_after: int = 1):
+        super().__init__(
+            "The server is busy right now. Please try again in a moment.",
+            status_code=503,
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
 def register_exception_handlers(app: FastAPI) -> None:
     @app.exception_handler(AppError)
     async def app_error_handler(request: Request, exc: AppError):
         return JSONResponse(
             status_code=exc.status_code,
             content={"detail": exc.message},
+            headers=exc.headers,
         )
@@ -0,0 +1,195 @@
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Generic, Hashable, Iterable, TypeVar
+
+from config import settings
+from core.metrics import Counter, Gauge, registry
+from models.post import Post
+from models.user import User
+
+T = TypeVar("T")
+
+# Per entry, on top of the record: the OrderedDict slot, its key and the expiry float
+_ENTRY_OVERHEAD = 160
+# Recent writes remembered per cache so a slower reader can't overwrite them
+_WRITE_LOG_SIZE = 4096
+_DATETIME_SIZE = sys.getsizeof(datetime(2000, 1, 1))
+
+# Select these to build a record positionally: PostRecord(*row), AuthorRecord(*row)
+POST_COLUMNS = (
+    Post.id, Post.user_id, Post.content, Post.created_at, Post.updated_at, Post.likes_count, Post.comments_count,
+)
+AUTHOR_COLUMNS = (User.id, User.username, User.display_name)
+
+
+@dataclass(frozen=True, slots=True)
+class PostRecord:
+    """Detached, read-only copy of a posts row, as feeds render it."""
+
+    id: int
+    user_id: int
+    content: str
+    created_at: datetime
+    updated_at: datetime
+    likes_count: int
+    comments_count: int
+
+    @classmethod
+    def from_post(cls, post: Post) -> "PostRecord":
+        return cls(*(getattr(post, column.key) for column in POST_COLUMNS))
+
+    def size(self) -> int:
+        return sys.getsizeof(self) + sys.getsizeof(self.content) + 2 * _DATETIME_SIZE
+
+
+@dataclass(frozen=True, slots=True)
+class AuthorRecord:
+    """The part of a users row shown next to posts."""
+
+    id: int
+    username: str
+    display_name: str | None
+
+    @classmethod
+    def from_user(cls, user: User) -> "AuthorRecord":
+        return cls(id=user.id, username=user.username, display_name=user.display_name)
+
+    def size(self) -> int:
+        return sys.getsizeof(self) + sys.getsizeof(self.username) + sys.getsizeof(self.display_name)
+
+
+class ObjectCache(Generic[T]):
+    """Process-local LRU of id → immutable record, bounded by approximate bytes.
+
+    Services that change a row call `put` with the new record or `invalidate`
+    after their commit. Readers that loaded a missed row call `fill` with the
+    `generation` they saw before their query; it does nothing if the key was
+    written since, so a query that raced a commit can't replace the newer
+    record. The TTL bounds how long another worker's change can go unseen,
+    since each process only sees its own writes.
+    """
+
+    def __init__(self, name: str, max_bytes: int, ttl_seconds: float, sizeof: Callable[[T], int]):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        self._sizeof = sizeof
+        self._entries: OrderedDict[Hashable, tuple[float, T, int]] = OrderedDict()
+        self.generation = 0
+        # key → generation of its latest write, oldest first; writes older than _floor are forgotten
+        self._writes: OrderedDict[Hashable, int] = OrderedDict()
+        self._floor = 0
+
+    def get_many(self, keys: Iterable[Hashable]) -> tuple[dict, list]:
+        """Return ({key: record} for fresh hits, [missing keys])."""
+        found, missing = {}, []
+        now = time.monotonic()
+        entries = self._entries
+        for key in keys:
+            entry = entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    self._discard(key)
+                missing.append(key)
+                continue
+            entries.move_to_end(key)
+            found[key] = entry[1]
+        self.hits += len(found)
+        self.misses += len(missing)
+        return found, missing
+
+    def put(self, key: Hashable, record: T) -> None:
+        """Store a record a write just committed."""
+        self._log_write(key)
+        self._store(key, record)
+
+    def fill(self, key: Hashable, record: T, since: int) -> None:
+        """Store a record read by a query that started at generation `since`."""
+        if since < self._floor or self._writes.get(key, -1) > since:
+            return
+        self._store(key, record)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._log_write(key)
+        self._discard(key)
+
+    def _store(self, key: Hashable, record: T) -> None:
+        size = self._sizeof(record) + _ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        self._discard(key)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, record, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            self._discard(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _log_write(self, key: Hashable) -> None:
+        self.generation += 1
+        self._writes.pop(key, None)
+        self._writes[key] = self.generation
+        if len(self._writes) > _WRITE_LOG_SIZE:
+            _, self._floor = self._writes.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _discard(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+
+
+post_cache: ObjectCache[PostRecord] = ObjectCache(
+    "post", settings.post_cache_max_bytes, settings.object_cache_ttl_seconds, PostRecord.size
+)
+author_cache: ObjectCache[AuthorRecord] = ObjectCache(
+    "author", settings.author_cache_max_bytes, settings.object_cache_ttl_seconds, AuthorRecord.size
+)
+
+
+
+def _cache_samples(read):
+    def collect():
+        for cache in (post_cache, author_cache):
+            yield (cache.name,), read(cache)
+    return collect
+
+
+registry.register(Gauge(
+    "object_cache_entries", "Records held by the hot post/author caches.", ("cache",),
+    collect=_cache_samples(lambda cache: len(cache._entries)),
+))
+registry.register(Gauge(
+    "object_cache_bytes", "Approximate memory held by the hot post/author caches.", ("cache",),
+    collect=_cache_samples(lambda cache: cache.bytes),
+))
+registry.register(Counter(
+    "object_cache_hits_total", "Post/author lookups served from the cache.", ("cache",),
+    collect=_cache_samples(lambda cache: cache.hits),
+))
+registry.register(Counter(
+    "object_cache_misses_total", "Post/author lookups that went to the database.", ("cache",),
+    collect=_cache_samples(lambda cache: cache.misses),
+))
+registry.register(Counter(
+    "object_cache_evictions_total", "Records dropped to stay under the cache's byte limit.", ("cache",),
+    collect=_cache_samples(lambda cache: cache.evictions),
+))
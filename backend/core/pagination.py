@@ -0,0 +1,47 @@
+import base64
+import binascii
+from datetime import datetime
+
+from core.exceptions import InvalidCursorError
+
+
+def _encode(*parts: object) -> str:
+    raw = "|".join(str(p) for p in parts).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode(cursor: str, size: int) -> list[str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        parts = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8").split("|")
+    except (binascii.Error, UnicodeError, ValueError):
+        raise InvalidCursorError()
+    if len(parts) != size:
+        raise InvalidCursorError()
+    return parts
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode a (created_at, id) seek position as an opaque, URL-safe token."""
+    return _encode(created_at.isoformat(), row_id)
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decode a token produced by encode_cursor, raising InvalidCursorError if tampered with."""
+    created_at, row_id = _decode(cursor, 2)
+    try:
+        return datetime.fromisoformat(created_at), int(row_id)
+    except ValueError:
+        raise InvalidCursorError()
+
+
+def encode_rank_cursor(*keys: int) -> str:
+    """Encode an integer sort key (e.g. match tier, followers_count, id) as an opaque token."""
+    return _encode(*keys)
+
+
+def decode_rank_cursor(cursor: str, size: int) -> tuple[int, ...]:
+    try:
+        return tuple(int(k) for k in _decode(cursor, size))
+    except ValueError:
+        raise InvalidCursorError()
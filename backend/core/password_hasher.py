@@ -0,0 +1,83 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from config import settings
+from core.exceptions import PasswordHasherBusyError
+from core.metrics import Gauge, registry
+from core.security import hash_password, verify_password
+
+T = TypeVar("T")
+
+
+class PasswordHasher:
+    """Runs bcrypt on a dedicated, bounded thread pool.
+
+    bcrypt releases the GIL while hashing, so plain threads give real
+    parallelism without the pickling cost of a process pool. Keeping it off
+    the shared anyio threadpool means a login storm can only saturate this
+    pool; once `workers + max_queue` calls are in flight, new ones are
+    rejected with a 503 instead of queueing behind everyone else.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.rejected = 0
+        self._in_flight = 0
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        """Calls waiting for a worker (in flight beyond the pool size)."""
+        return max(0, self._in_flight - self.workers)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "workers": self.workers,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, fn: Callable[..., T], *args) -> T:
+        # Only touched from the event loop thread, so the counter needs no lock
+        if self._in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise PasswordHasherBusyError()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+
+        loop = asyncio.get_running_loop()
+        future = self._executor.submit(fn, *args)
+        self._in_flight += 1
+        # Count down when the work really finishes, even if the awaiting request was cancelled
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release))
+        return await asyncio.wrap_future(future)
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+
+
+password_hasher = PasswordHasher(settings.password_hash_workers, settings.password_hash_max_queue)
+
+registry.register(Gauge(
+    "password_hasher_calls", "bcrypt calls running or queued on the hashing pool.", ("state",),
+    collect=lambda: [(("running",), password_hasher.in_flight - password_hasher.queue_depth),
+                     (("queued",), password_hasher.queue_depth)],
+))
@@ -0,0 +1,127 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+
+from config import settings
+from core.metrics import Counter, Gauge, registry
+from models.user import User
+
+
+@dataclass(frozen=True, slots=True)
+class UserSnapshot:
+    """Detached, read-only view of the authenticated user.
+
+    Services that need to mutate the user load the ORM row by id.
+    """
+
+    id: int
+    username: str
+    email: str
+    created_at: datetime
+    display_name: str | None
+    followers_count: int
+    following_count: int
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            created_at=user.created_at,
+            display_name=user.display_name,
+            followers_count=user.followers_count,
+            following_count=user.following_count,
+        )
+
+
+class PrincipalCache:
+    """Bounded LRU of bearer token → UserSnapshot.
+
+    An entry lives for at most ttl_seconds and never past its token's exp, so a
+    hit skips both the JWT signature check and the users lookup.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, tuple[float, UserSnapshot]] = OrderedDict()
+        self._tokens_by_user: dict[int, set[str]] = {}
+
+    def get(self, token: str) -> UserSnapshot | None:
+        entry = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, snapshot = entry
+        if expires_at <= time.monotonic():
+            self._discard(token)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return snapshot
+
+    def put(self, token: str, snapshot: UserSnapshot, token_exp: int) -> None:
+        lifetime = min(self.ttl_seconds, token_exp - time.time())
+        if lifetime <= 0 or self.maxsize <= 0:
+            return
+        self._discard(token)
+        self._entries[token] = (time.monotonic() + lifetime, snapshot)
+        self._tokens_by_user.setdefault(snapshot.id, set()).add(token)
+        while len(self._entries) > self.maxsize:
+            oldest = next(iter(self._entries))
+            self._discard(oldest)
+            self.evictions += 1
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop every cached token for a user whose profile, counters or account changed."""
+        for token in self._tokens_by_user.pop(user_id, set()):
+            self._entries.pop(token, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tokens_by_user.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _discard(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        tokens = self._tokens_by_user.get(entry[1].id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[entry[1].id]
+
+
+principal_cache = PrincipalCache(settings.principal_cache_size, settings.principal_cache_ttl_seconds)
+
+
+registry.register(Gauge(
+    "principal_cache_size", "Tokens in the authenticated principal cache.",
+    collect=lambda: [((), principal_cache.stats()["size"])],
+))
+registry.register(Counter(
+    "principal_cache_hits_total", "Principal lookups served from the cache.",
+    collect=lambda: [((), principal_cache.hits)],
+))
+registry.register(Counter(
+    "principal_cache_misses_total", "Principal lookups that decoded the token and loaded the user.",
+    collect=lambda: [((), principal_cache.misses)],
+))
+registry.register(Counter(
+    "principal_cache_evictions_total", "Principals dropped to stay under PRINCIPAL_CACHE_SIZE.",
+    collect=lambda: [((), principal_cache.evictions)],
+))
@@ -0,0 +1,185 @@
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from urllib.parse import parse_qs
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config import settings
+from core.security import verify_profile_token
+
+logger = logging.getLogger("cadrebook.profile")
+
+PROFILE_HEADER = b"x-profile-token"
+PROFILE_QUERY = "profile_token"
+
+# A worker thread whose innermost frame is in one of these is parked on a lock or
+# queue, not working; its samples would only bury the interesting stacks.
+_IDLE_FILES = ("threading.py", "queue.py")
+_PATH_CHARS = re.compile(r"[^A-Za-z0-9]+")
+_BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(_BACKEND_ROOT):
+        filename = filename[len(_BACKEND_ROOT):]
+    elif "site-packages" + os.sep in filename:
+        filename = filename.split("site-packages" + os.sep, 1)[1]
+    else:
+        filename = os.path.basename(filename)
+    # ';' separates frames in the collapsed format
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+def _stack(frame) -> list[str]:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+class StackSampler:
+    """Samples every thread's Python stack on a timer into collapsed-stack counts.
+
+    Runs on its own thread, so it sees the event loop and the worker threads
+    (aiosqlite, bcrypt, sync dependencies) while they hold the GIL or wait on I/O.
+    Other requests interleaved on the event loop are sampled as well; profile a
+    quiet moment or read the flamegraph by route function.
+    """
+
+    def __init__(self, loop_thread: int, interval: float, max_seconds: float):
+        self.loop_thread = loop_thread
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        deadline = time.monotonic() + self.max_seconds
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                if ident != self.loop_thread and frame.f_code.co_filename.endswith(_IDLE_FILES):
+                    continue
+                root = "event-loop" if ident == self.loop_thread else names.get(ident, str(ident))
+                self.stacks[";".join([root, *_stack(frame)])] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed format; speedscope and flamegraph.pl read it as is."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _requested_token(scope: Scope) -> str | None:
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            return value.decode("latin-1")
+    query = scope.get("query_string", b"")
+    if PROFILE_QUERY.encode() in query:
+        values = parse_qs(query.decode("latin-1")).get(PROFILE_QUERY)
+        if values:
+            return values[0]
+    return None
+
+
+class ProfilingMiddleware:
+    """Profiles a single request on demand.
+
+    A request carrying a valid profile token (see profile_token.py) in the
+    `X-Profile-Token` header or `?profile_token=` is run under `StackSampler`,
+    and the collapsed stacks are written to `PROFILE_DIR`. The file name comes
+    back in the `X-Profile` response header. Only one request is profiled at a
+    time and at most one per `PROFILE_MIN_INTERVAL_SECONDS`; anything else,
+    including invalid tokens, is served normally without profiling.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._busy = False
+        self._last_started = float("-inf")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _requested_token(scope)
+        if token is None or not self._acquire(token, scope):
+            await self.app(scope, receive, send)
+            return
+
+        filename = self._filename(scope)
+        sampler = StackSampler(
+            threading.get_ident(),
+            settings.profile_interval_ms / 1000,
+            settings.profile_max_seconds,
+        )
+
+        async def send_with_profile(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile", filename)
+            await send(message)
+
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            sampler.stop()
+            self._busy = False
+            self._write(filename, sampler, scope, time.perf_counter() - started)
+
+    def _acquire(self, token: str, scope: Scope) -> bool:
+        now = time.monotonic()
+        if self._busy or now - self._last_started < settings.profile_min_interval_seconds:
+            logger.debug(json.dumps({"event": "profile_skipped", "path": scope["path"], "reason": "rate_limited"}))
+            return False
+        # Checked after the rate limit, so during the cooldown tokens are not even decoded
+        if not verify_profile_token(token):
+            logger.warning(json.dumps({"event": "profile_skipped", "path": scope["path"], "reason": "invalid_token"}))
+            return False
+        self._busy = True
+        self._last_started = now
+        return True
+
+    @staticmethod
+    def _filename(scope: Scope) -> str:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S.%f")
+        path = _PATH_CHARS.sub("_", scope["path"]).strip("_")[:60] or "root"
+        return f"{stamp}-{scope['method']}-{path}.collapsed"
+
+    @staticmethod
+    def _write(filename: str, sampler: StackSampler, scope: Scope, seconds: float) -> None:
+        os.makedirs(settings.profile_dir, exist_ok=True)
+        with open(os.path.join(settings.profile_dir, filename), "w", encoding="utf-8") as f:
+            f.write(sampler.collapsed())
+        logger.info(json.dumps({
+            "event": "profile_written",
+            "file": filename,
+            "method": scope["method"],
+            "path": scope["path"],
+            "samples": sampler.samples,
+            "ms": round(seconds * 1000, 2),
+        }))
@@ -0,0 +1,197 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+from typing import Callable, Iterable
+
+from config import settings
+
+logger = logging.getLogger("cadrebook.pubsub")
+
+Deliver = Callable[[list[str], bytes], None]
+
+
+def post_topic(post_id: int) -> str:
+    return f"post:{post_id}"
+
+
+def author_topic(user_id: int) -> str:
+    return f"author:{user_id}"
+
+
+class Subscription:
+    """One connected client: the topics it watches and a bounded outbox.
+
+    A client that can't keep up is not buffered without limit. When the outbox
+    fills, pending events are dropped and `get()` returns None, telling the
+    transport to send a resync and close; the client refetches and reconnects.
+    """
+
+    def __init__(self, max_queue: int):
+        self.topics: set[str] = set()
+        self.overflowed = False
+        self._queue: asyncio.Queue[bytes | None] = asyncio.Queue(max_queue)
+
+    def deliver(self, message: bytes) -> None:
+        if self.overflowed:
+            return
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(None)
+
+    async def get(self) -> bytes | None:
+        return await self._queue.get()
+
+
+class MemoryBackend:
+    """Delivers to subscribers of this process only. Right for a single worker."""
+
+    def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    def publish(self, topics: list[str], message: bytes) -> None:
+        self._deliver(topics, message)
+
+    def close(self) -> None:
+        pass
+
+
+class UnixSocketBackend:
+    """Fans events out to every worker on this host through Unix datagram sockets.
+
+    Each worker binds `<directory>/<pid>.sock` and a publish sends one datagram
+    to every socket in the directory. Sockets left behind by dead workers
+    refuse the send and are removed. Delivery is best effort: if a peer's
+    receive buffer is full the event is dropped for that worker, like a slow
+    client. It stands in for Redis pub/sub or Postgres LISTEN/NOTIFY when
+    running several uvicorn workers on one machine.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.dropped = 0
+        self._sock: socket.socket | None = None
+        self._path = ""
+
+    def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+        os.makedirs(self.directory, exist_ok=True)
+        self._path = os.path.join(self.directory, f"{os.getpid()}.sock")
+        if os.path.exists(self._path):
+            os.unlink(self._path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.bind(self._path)
+        self._sock.setblocking(False)
+        asyncio.get_running_loop().add_reader(self._sock.fileno(), self._receive)
+
+    def publish(self, topics: list[str], message: bytes) -> None:
+        self._deliver(topics, message)
+        datagram = json.dumps(topics).encode() + b"\n" + message
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if path == self._path or not name.endswith(".sock"):
+                continue
+            try:
+                self._sock.sendto(datagram, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                self._remove_stale(path)
+            except BlockingIOError:
+                self.dropped += 1
+
+    def close(self) -> None:
+        if self._sock is None:
+            return
+        asyncio.get_running_loop().remove_reader(self._sock.fileno())
+        self._sock.close()
+        self._sock = None
+        self._remove_stale(self._path)
+
+    def _receive(self) -> None:
+        while True:
+            try:
+                datagram = self._sock.recv(65536)
+            except BlockingIOError:
+                return
+            topics, _, message = datagram.partition(b"\n")
+            self._deliver(json.loads(topics), message)
+
+    @staticmethod
+    def _remove_stale(path: str) -> None:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+class Broker:
+    """Topic-based pub/sub for live updates.
+
+    Services publish after their commit; routers/events.py subscribes
+    WebSocket and SSE clients. Topics are `post:<id>` and `author:<user_id>`.
+    The backend decides which processes see an event (see EVENT_BACKEND).
+    """
+
+    def __init__(self, backend, max_queue: int):
+        self.backend = backend
+        self.max_queue = max_queue
+        self._subscribers: dict[str, set[Subscription]] = {}
+
+    def start(self) -> None:
+        self.backend.start(self._deliver)
+
+    def close(self) -> None:
+        self.backend.close()
+
+    def subscription(self) -> Subscription:
+        return Subscription(self.max_queue)
+
+    def set_topics(self, subscription: Subscription, topics: Iterable[str]) -> None:
+        """Replace what `subscription` watches."""
+        topics = set(topics)
+        for topic in subscription.topics - topics:
+            self._unsubscribe(subscription, topic)
+        for topic in topics - subscription.topics:
+            self._subscribers.setdefault(topic, set()).add(subscription)
+        subscription.topics = topics
+
+    def remove(self, subscription: Subscription) -> None:
+        self.set_topics(subscription, ())
+
+    @property
+    def subscriber_count(self) -> int:
+        return len({sub for subs in self._subscribers.values() for sub in subs})
+
+    def publish(self, topics: list[str], event: dict) -> None:
+        """Send `event` to everyone watching any of `topics`. Never blocks."""
+        self.backend.publish(topics, json.dumps(event, separators=(",", ":")).encode("utf-8"))
+
+    def _deliver(self, topics: list[str], message: bytes) -> None:
+        # A client watching both the post and its author gets the event once
+        receivers = set()
+        for topic in topics:
+            receivers.update(self._subscribers.get(topic, ()))
+        for subscription in receivers:
+            subscription.deliver(message)
+
+    def _unsubscribe(self, subscription: Subscription, topic: str) -> None:
+        subscribers = self._subscribers.get(topic)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[topic]
+
+
+def _backend():
+    if settings.event_backend == "unix":
+        return UnixSocketBackend(settings.event_socket_dir)
+    if settings.event_backend == "memory":
+        return MemoryBackend()
+    raise ValueError(f"Unknown EVENT_BACKEND {settings.event_backend!r} (expected 'memory' or 'unix')")
+
+
+broker = Broker(_backend(), settings.event_queue_size)
@@ -0,0 +1,22 @@
+from fastapi import Response
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+
+class ModelResponse(Response):
+    """JSON response rendered straight from a Pydantic model by pydantic-core.
+
+    Returning a Response makes FastAPI skip re-validating the value against
+    `response_model` and the jsonable_encoder + json.dumps round trip. The
+    bytes match what the default JSONResponse would produce for the same
+    model, so `response_model` stays on the route for the OpenAPI schema.
+    Only hand it models built by the service layer. Plain dicts and lists
+    (e.g. a normalized feed page) are written by pydantic-core as well.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: BaseModel | dict | list) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        return to_json(content)
@@ -20,12 +20,38 @@ def create_access_token(user_id: int) -> str:
     return jwt.encode(payload, settings.secret_key, algorithm=settings.algorithm)
 
 
-def decode_access_token(token: str) -> int:
+def decode_access_token_claims(token: str) -> tuple[int, int]:
+    """Return (user_id, exp) where exp is the token's expiry as a Unix timestamp."""
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
         user_id = payload.get("sub")
-        if user_id is None:
+        expires_at = payload.get("exp")
+        if user_id is None or expires_at is None:
             raise ValueError("Invalid token payload")
-        return int(user_id)
+        return int(user_id), int(expires_at)
     except JWTError:
         raise ValueError("Token is invalid or expired")
+
+
+def decode_access_token(token: str) -> int:
+    user_id, _ = decode_access_token_claims(token)
+    return user_id
+
+
+# Profile tokens share the signing key with access tokens; the purpose claim keeps
+# the two from being accepted in place of each other.
+PROFILE_TOKEN_PURPOSE = "profile"
+
+
+def create_profile_token(minutes: int) -> str:
+    expire = datetime.utcnow() + timedelta(minutes=minutes)
+    payload = {"sub": PROFILE_TOKEN_PURPOSE, "purpose": PROFILE_TOKEN_PURPOSE, "exp": expire}
+    return jwt.encode(payload, settings.secret_key, algorithm=settings.algorithm)
+
+
+def verify_profile_token(token: str) -> bool:
+    try:
+        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+    except JWTError:
+        return False
+    return payload.get("purpose") == PROFILE_TOKEN_PURPOSE
@@ -0,0 +1,159 @@
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config import settings
+
+logger = logging.getLogger("cadrebook.sql")
+
+# Expanded IN lists differ in length per call; collapse them so one loop is one shape
+_IN_LIST = re.compile(r"\bIN \([^()]*\)", re.IGNORECASE)
+_EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE")
+_MAX_PARAM_CHARS = 200
+
+
+@dataclass(slots=True)
+class RequestQueries:
+    """SQL issued while serving one request."""
+
+    count: int = 0
+    seconds: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.shapes[_IN_LIST.sub("IN (...)", " ".join(statement.split()))] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statement shapes run at least `threshold` times — the usual N+1 signature."""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+
+_current: ContextVar[RequestQueries | None] = ContextVar("request_queries", default=None)
+
+
+def _before_cursor_execute(_conn, _cursor, _statement, _parameters, context, _executemany):
+    # Kept on the execution context, which a failed statement takes with it
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, _cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - context._query_started
+    if conn.info.get("explaining"):
+        return
+    queries = _current.get()
+    if queries is not None:
+        queries.record(statement, seconds)
+    if settings.slow_query_ms and seconds * 1000 >= settings.slow_query_ms:
+        _log_slow_query(conn, statement, parameters, executemany, seconds)
+
+
+def _printable(value):
+    if isinstance(value, str) and len(value) > _MAX_PARAM_CHARS:
+        return value[:_MAX_PARAM_CHARS] + "…"
+    return value
+
+
+def _query_plan(conn, statement: str, parameters) -> list[str]:
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    # Flag the connection so the EXPLAIN itself isn't counted or logged
+    conn.info["explaining"] = True
+    try:
+        rows = conn.exec_driver_sql(prefix + statement, parameters).fetchall()
+    except Exception as e:
+        return [f"unavailable: {e}"]
+    finally:
+        conn.info["explaining"] = False
+    return [" ".join(str(col) for col in row) for row in rows]
+
+
+def _log_slow_query(conn, statement: str, parameters, executemany: bool, seconds: float) -> None:
+    plan = None
+    if not executemany and statement.lstrip().upper().startswith(_EXPLAINABLE):
+        plan = _query_plan(conn, statement, parameters)
+    if executemany:
+        parameters = f"{len(parameters)} parameter sets"
+    elif isinstance(parameters, dict):
+        parameters = {k: _printable(v) for k, v in parameters.items()}
+    else:
+        parameters = [_printable(v) for v in parameters]
+    logger.warning(json.dumps({
+        "event": "slow_query",
+        "ms": round(seconds * 1000, 2),
+        "statement": " ".join(statement.split()),
+        "parameters": parameters,
+        "plan": plan,
+    }, default=str))
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement on `engine` (pass `async_engine.sync_engine` for async engines)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class SQLInstrumentationMiddleware:
+    """Counts queries and DB time per request.
+
+    Adds a `Server-Timing` header (db and app durations, visible in browser
+    devtools) and logs one JSON line per request. Statement shapes repeated
+    `n_plus_one_threshold` times or more are flagged as a likely N+1.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries()
+        token = _current.set(queries)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                app_ms = (time.perf_counter() - started) * 1000
+                MutableHeaders(scope=message).append(
+                    "Server-Timing",
+                    f'db;dur={queries.seconds * 1000:.2f};desc="{queries.count} queries", app;dur={app_ms:.2f}',
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            self._log(scope, status, queries, time.perf_counter() - started)
+
+    @staticmethod
+    def _log(scope: Scope, status: int, queries: RequestQueries, seconds: float) -> None:
+        repeated = queries.repeated(settings.n_plus_one_threshold)
+        line = {
+            "event": "request_sql",
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status,
+            "queries": queries.count,
+            "db_ms": round(queries.seconds * 1000, 2),
+            "total_ms": round(seconds * 1000, 2),
+        }
+        if repeated:
+            line["n_plus_one"] = [{"statement": shape, "count": n} for shape, n in repeated]
+            logger.warning(json.dumps(line))
+        else:
+            logger.info(json.dumps(line))
@@ -0,0 +1,371 @@
+import asyncio
+import base64
+import glob
+import heapq
+import json
+import logging
+import os
+import re
+import time
+from array import array
+from collections import deque
+
+from config import settings
+
+logger = logging.getLogger("cadrebook.trending")
+
+LIKE_WEIGHT = 1
+COMMENT_WEIGHT = 2
+# Each window tracks this many times the largest result it serves as heavy-hitter candidates
+CANDIDATE_FACTOR = 4
+SNAPSHOT_VERSION = 1
+# A worker's snapshot that hasn't been rewritten for this many intervals belongs to a dead worker
+STALE_SNAPSHOT_INTERVALS = 3
+
+# (a, b) pairs for the rows' ((a·x + b) mod p) mod width hashes, p = 2^61 - 1. Fixed,
+# not seeded per process, so a snapshot written by one process reads back in another.
+_PRIME = (1 << 61) - 1
+_HASHES = (
+    (0x093EC0A88818A00C, 0x1176DE29714E9FDC),
+    (0x12BF67574F5FABA7, 0x1094D7AD0F8FEC7A),
+    (0x16213AD6C89BAB79, 0x1691D98BFB662BA8),
+    (0x15EBE53E6990ECFD, 0x0A063A7FA250AE18),
+    (0x006464D2CF95C7A2, 0x1C76F624DC6FE53D),
+    (0x0DCDF4F1C2D0F007, 0x14ADB3F24F0066C4),
+)
+
+
+class CountMinSketch:
+    """Approximate per-item counts in `depth` rows of `width` int32 counters.
+
+    An estimate never undercounts, and overcounts by at most about
+    2/width of the total with probability 1 - 2^-depth.
+    """
+
+    __slots__ = ("width", "depth", "counts")
+
+    def __init__(self, width: int, depth: int, counts: array | None = None):
+        if depth > len(_HASHES):
+            raise ValueError(f"depth must be at most {len(_HASHES)}")
+        self.width = width
+        self.depth = depth
+        self.counts = counts if counts is not None else array("i", bytes(4 * width * depth))
+
+    def cells(self, item: int) -> list[int]:
+        """The counter `item` maps to in each row; equal for sketches of the same shape."""
+        width = self.width
+        return [row * width + (a * item + b) % _PRIME % width for row, (a, b) in enumerate(_HASHES[:self.depth])]
+
+    def add(self, cells: list[int], count: int = 1) -> None:
+        counts = self.counts
+        for cell in cells:
+            counts[cell] += count
+
+    def estimate(self, cells: list[int]) -> int:
+        counts = self.counts
+        return min(counts[cell] for cell in cells)
+
+    def merge(self, other: "CountMinSketch", sign: int = 1) -> None:
+        counts = self.counts
+        for i, value in enumerate(other.counts):
+            if value:
+                counts[i] += sign * value
+
+
+class RecentPairs:
+    """Approximate set of the keys added in the last `buckets` × `bucket_seconds`.
+
+    Each bucket is a Bloom filter of `bits` bits, so memory stays fixed
+    however many keys arrive. A key counts as seen while any live bucket
+    holds it. There are no false negatives. A false positive (about 1% at
+    100,000 keys per bucket with 2^20 bits) makes a new key look seen.
+    """
+
+    HASHES = 4
+
+    def __init__(self, bucket_seconds: int, buckets: int, bits: int):
+        self.bucket_seconds = bucket_seconds
+        self.buckets = buckets
+        self.bits = bits
+        self.ring: deque[tuple[int, bytearray]] = deque()
+
+    def add(self, key: int, now: float) -> bool:
+        """Add `key`; False if it was (probably) already added within the window."""
+        index = int(now // self.bucket_seconds)
+        while self.ring and self.ring[0][0] <= index - self.buckets:
+            self.ring.popleft()
+        if not self.ring or self.ring[-1][0] != index:
+            self.ring.append((index, bytearray(self.bits // 8)))
+
+        positions = [(a * key + b) % _PRIME % self.bits for a, b in _HASHES[:self.HASHES]]
+        for _, bloom in self.ring:
+            if all(bloom[p >> 3] & (1 << (p & 7)) for p in positions):
+                return False
+        current = self.ring[-1][1]
+        for p in positions:
+            current[p >> 3] |= 1 << (p & 7)
+        return True
+
+
+class SlidingWindow:
+    """Top items by count over the last `buckets` × `bucket_seconds`.
+
+    Events go into the current bucket's sketch and into a running total. When
+    a bucket leaves the window its sketch is subtracted from the total, so an
+    estimate is always one lookup, however long the window. The heavy hitters
+    are kept in a bounded candidate map. An item enters only when its estimate
+    beats the weakest candidate, so a query ranks `capacity` entries and never
+    touches the database.
+    """
+
+    def __init__(self, bucket_seconds: int, buckets: int, width: int, depth: int, capacity: int):
+        self.bucket_seconds = bucket_seconds
+        self.buckets = buckets
+        self.width = width
+        self.depth = depth
+        self.capacity = capacity
+        self.total = CountMinSketch(width, depth)
+        self.ring: deque[tuple[int, CountMinSketch]] = deque()
+        self.candidates: dict[int, int] = {}
+        # Lowest estimate among candidates once the map is full; cheaper events are rejected in O(1)
+        self._floor = 0
+
+    def _advance(self, index: int) -> None:
+        expired = False
+        while self.ring and self.ring[0][0] <= index - self.buckets:
+            _, sketch = self.ring.popleft()
+            self.total.merge(sketch, -1)
+            expired = True
+        if expired:
+            total = self.total
+            self.candidates = {
+                item: count for item in self.candidates if (count := total.estimate(total.cells(item))) > 0
+            }
+            self._refresh_floor()
+        if not self.ring or self.ring[-1][0] != index:
+            self.ring.append((index, CountMinSketch(self.width, self.depth)))
+
+    def _refresh_floor(self) -> None:
+        full = len(self.candidates) >= self.capacity
+        self._floor = min(self.candidates.values()) if full else 0
+
+    def add(self, item: int, cells: list[int], count: int, now: float) -> None:
+        self._advance(int(now // self.bucket_seconds))
+        self.ring[-1][1].add(cells, count)
+        self.total.add(cells, count)
+        estimate = self.total.estimate(cells)
+        candidates = self.candidates
+        if item in candidates:
+            candidates[item] = estimate
+        elif len(candidates) < self.capacity:
+            candidates[item] = estimate
+            self._refresh_floor()
+        elif estimate > self._floor:
+            del candidates[min(candidates, key=candidates.__getitem__)]
+            candidates[item] = estimate
+            self._refresh_floor()
+
+    def discard(self, item: int) -> None:
+        if self.candidates.pop(item, None) is not None:
+            self._refresh_floor()
+
+    def top(self, limit: int, now: float) -> list[tuple[int, int]]:
+        self._advance(int(now // self.bucket_seconds))
+        return heapq.nlargest(limit, self.candidates.items(), key=lambda entry: (entry[1], entry[0]))
+
+    def snapshot(self) -> dict:
+        return {
+            "buckets": [[index, base64.b64encode(sketch.counts.tobytes()).decode("ascii")] for index, sketch in self.ring],
+            "candidates": list(self.candidates),
+        }
+
+    def merge(self, data: dict, now: float) -> None:
+        """Add a snapshot's counts to this window, bucket by bucket."""
+        ring = dict(self.ring)
+        for index, encoded in data["buckets"]:
+            counts = array("i")
+            counts.frombytes(base64.b64decode(encoded))
+            sketch = CountMinSketch(self.width, self.depth, counts)
+            if index in ring:
+                ring[index].merge(sketch)
+            else:
+                ring[index] = sketch
+            self.total.merge(sketch)
+        self.ring = deque(sorted(ring.items()))
+        total = self.total
+        self.candidates = {
+            item: total.estimate(total.cells(item)) for item in {*self.candidates, *data["candidates"]}
+        }
+        # Drops buckets that aged out while the snapshot's process was down
+        self._advance(int(now // self.bucket_seconds))
+        candidates = {item: count for item, count in self.candidates.items() if count > 0}
+        if len(candidates) > self.capacity:
+            candidates = dict(heapq.nlargest(self.capacity, candidates.items(), key=lambda entry: entry[1]))
+        self.candidates = candidates
+        self._refresh_floor()
+
+
+class TrendingTracker:
+    """In-memory engagement per post over sliding windows, for GET /posts/trending.
+
+    like_service and comment_service record engagement after their commit.
+    A like counts once per (user, post) per 24 hours, so toggling a like
+    can't inflate a post, and unlikes and deleted comments are not
+    subtracted: a window counts who engaged, not the current like count.
+    Like the event broker, each worker process counts only the requests it
+    serves. Each worker writes its own snapshot next to
+    TRENDING_SNAPSHOT_PATH every TRENDING_SNAPSHOT_SECONDS and at shutdown;
+    at startup a worker merges in the snapshots that stopped workers left.
+    """
+
+    def __init__(self, width: int, depth: int, max_results: int, liker_bits: int):
+        self.width = width
+        self.depth = depth
+        self.max_results = max_results
+        capacity = max_results * CANDIDATE_FACTOR
+        self.windows = {
+            "1h": SlidingWindow(300, 12, width, depth, capacity),
+            "24h": SlidingWindow(3600, 24, width, depth, capacity),
+        }
+        self.likers = RecentPairs(3600, 24, liker_bits)
+
+    def record(self, post_id: int, weight: int = LIKE_WEIGHT) -> None:
+        now = time.time()
+        # Every sketch has the same shape, so the hashes are computed once per event
+        cells = self.windows["1h"].total.cells(post_id)
+        for window in self.windows.values():
+            window.add(post_id, cells, weight, now)
+
+    def record_like(self, user_id: int, post_id: int) -> None:
+        """Count a new like unless this user already liked the post within the last 24 hours."""
+        if self.likers.add(user_id << 32 | post_id, time.time()):
+            self.record(post_id, LIKE_WEIGHT)
+
+    def discard(self, post_id: int) -> None:
+        """Forget a deleted post; its counts stay in the sketches until they age out."""
+        for window in self.windows.values():
+            window.discard(post_id)
+
+    def top(self, window: str, limit: int) -> list[tuple[int, int]]:
+        """Up to `limit` (post_id, engagement) pairs for `window`, highest first."""
+        return self.windows[window].top(min(limit, self.max_results), time.time())
+
+    def snapshot(self) -> dict:
+        return {
+            "version": SNAPSHOT_VERSION,
+            "width": self.width,
+            "depth": self.depth,
+            "windows": {name: window.snapshot() for name, window in self.windows.items()},
+        }
+
+    def merge(self, data: dict) -> bool:
+        """Add a snapshot's counts to the current state; False if its sketch shape differs."""
+        if (data.get("version"), data.get("width"), data.get("depth")) != (SNAPSHOT_VERSION, self.width, self.depth):
+            return False
+        now = time.time()
+        for name, window in self.windows.items():
+            if name in data["windows"]:
+                window.merge(data["windows"][name], now)
+        return True
+
+    def load(self, path: str, stale_after: float) -> int:
+        """Merge in every snapshot whose worker is gone, and return how many were adopted.
+
+        Those are the snapshots of workers that shut down, of workers that
+        stopped rewriting theirs `stale_after` seconds ago (crashed), and a
+        single-file snapshot from before snapshots were per worker. A worker
+        claims a file by renaming it first, so concurrent startups never
+        adopt the same one twice.
+        """
+        adopted = 0
+        for claimed in _claim_snapshots(path, stale_after):
+            try:
+                with open(claimed, encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring unreadable trending snapshot %s: %s", claimed, e)
+                data = None
+            if data is not None:
+                if self.merge(data):
+                    adopted += 1
+                else:
+                    logger.warning("Ignoring trending snapshot %s written with different sketch settings", claimed)
+            _remove(claimed)
+        return adopted
+
+    async def save(self, path: str) -> None:
+        """Write this worker's snapshot, `<name>.<pid>.json` next to `path`."""
+        # Serialized on the event loop for a consistent view, written off it
+        payload = json.dumps(self.snapshot(), separators=(",", ":"))
+        await asyncio.to_thread(_write_atomic, _worker_path(path, str(os.getpid())), payload)
+
+    async def close(self, path: str) -> None:
+        """Final snapshot at shutdown, left for the next worker that starts to adopt."""
+        await self.save(path)
+        pid = str(os.getpid())
+        os.replace(_worker_path(path, pid), _worker_path(path, f"stopped-{pid}"))
+
+    async def run_snapshots(self, path: str, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.save(path)
+            except OSError as e:
+                logger.warning("Could not write trending snapshot %s: %s", path, e)
+
+
+def _worker_path(path: str, worker: str) -> str:
+    root, ext = os.path.splitext(path)
+    return f"{root}.{worker}{ext}"
+
+
+def _claim_snapshots(path: str, stale_after: float) -> list[str]:
+    root, ext = os.path.splitext(path)
+    live = re.compile(re.escape(os.path.basename(root)) + r"\.(\d+)" + re.escape(ext) + "$")
+    own = str(os.getpid())
+    orphans = [path, *glob.glob(f"{glob.escape(root)}.stopped-*{glob.escape(ext)}")]
+    now = time.time()
+    for candidate in glob.glob(f"{glob.escape(root)}.*{glob.escape(ext)}"):
+        match = live.match(os.path.basename(candidate))
+        if match and match.group(1) != own:
+            try:
+                if now - os.path.getmtime(candidate) > stale_after:
+                    orphans.append(candidate)
+            except OSError:
+                pass
+
+    claimed = []
+    for orphan in orphans:
+        target = f"{orphan}.claimed-{own}"
+        try:
+            os.rename(orphan, target)
+        except OSError:
+            # Missing, or another worker renamed it first
+            continue
+        claimed.append(target)
+    return claimed
+
+
+def _remove(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _write_atomic(path: str, payload: str) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(payload)
+    os.replace(tmp, path)
+
+
+trending = TrendingTracker(
+    settings.trending_sketch_width,
+    settings.trending_sketch_depth,
+    settings.trending_max_results,
+    settings.trending_liker_filter_bits,
+)
@@ -1,33 +1,165 @@
+import time
+
+from fastapi import Request
 from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from config import settings
+from core.metrics import Gauge, db_pool_wait, registry
+
+# Async drivers for the sync URLs accepted in DATABASE_URL
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+# Methods served from the read-only engine; everything else goes through the writer
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def _async_url(url: str) -> str:
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def _connect_args(url: str) -> dict:
+    return {"check_same_thread": False} if url.startswith("sqlite") else {}
+
+
+def _sqlite_pragmas(read_only: bool):
+    def set_sqlite_pragma(dbapi_conn, _connection_record):
+        cursor = dbapi_conn.cursor()
+        if not read_only:
+            # WAL lets readers keep going while the single writer commits; the mode is persistent
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA cache_size=-{settings.sqlite_cache_size_kib}")
+        cursor.execute(f"PRAGMA mmap_size={settings.sqlite_mmap_size}")
+        cursor.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}")
+        # SQLite does not enforce foreign keys by default
+        cursor.execute("PRAGMA foreign_keys=ON")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
 
+    return set_sqlite_pragma
 
+
+def _configure(sync_engine: Engine, read_only: bool = False) -> None:
+    if sync_engine.dialect.name == "sqlite":
+        event.listen(sync_engine, "connect", _sqlite_pragmas(read_only))
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited (including connects) in db_pool_wait_seconds."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_wait.observe(time.perf_counter() - started, self.logging_name)
+
+
+# Request handling runs on async engines: one writer for mutations, a read-only pool for GETs.
+# The pool class is explicit because aiosqlite otherwise opens a new connection per session.
+async_engine = create_async_engine(
+    _async_url(settings.database_url),
+    connect_args=_connect_args(settings.database_url),
+    poolclass=TimedQueuePool,
+    pool_logging_name="write",
+    pool_size=settings.db_write_pool_size,
+    max_overflow=0,
+    pool_timeout=settings.db_pool_timeout,
+)
+_read_url = settings.database_read_url or settings.database_url
+read_engine = create_async_engine(
+    _async_url(_read_url),
+    connect_args=_connect_args(_read_url),
+    poolclass=TimedQueuePool,
+    pool_logging_name="read",
+    pool_size=settings.db_read_pool_size,
+    max_overflow=settings.db_read_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+)
+
+# Scripts and maintenance jobs (seed.py, rebuild_timelines.py) use the sync engine
 engine = create_engine(
     settings.database_url,
-    connect_args={"check_same_thread": False},  # SQLite only
+    connect_args=_connect_args(settings.database_url),
 )
 
+_configure(engine)
+_configure(async_engine.sync_engine)
+_configure(read_engine.sync_engine, read_only=True)
+
+
+def _pool_samples(read):
+    def collect():
+        for name, pool in (("write", async_engine.pool), ("read", read_engine.pool)):
+            yield (name,), read(pool)
+    return collect
+
 
-# Enable foreign key enforcement for every SQLite connection
-@event.listens_for(engine, "connect")
-def set_sqlite_pragma(dbapi_conn, _connection_record):
-    cursor = dbapi_conn.cursor()
-    cursor.execute("PRAGMA foreign_keys=ON")
-    cursor.close()
+registry.register(Gauge(
+    "db_pool_size", "Configured persistent connections per pool.", ("pool",),
+    collect=_pool_samples(lambda pool: pool.size()),
+))
+registry.register(Gauge(
+    "db_pool_checked_out", "Connections currently lent to sessions.", ("pool",),
+    collect=_pool_samples(lambda pool: pool.checkedout()),
+))
+# QueuePool counts overflow from -pool_size while the pool is still filling; only the excess is interesting
+registry.register(Gauge(
+    "db_pool_overflow", "Connections open beyond pool_size.", ("pool",),
+    collect=_pool_samples(lambda pool: max(0, pool.overflow())),
+))
 
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# expire_on_commit=False: services read attributes after commit, and async sessions can't lazy-reload them
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+ReadSessionLocal = async_sessionmaker(
+    read_engine, autoflush=False, expire_on_commit=False
+)
+
 
 class Base(DeclarativeBase):
     pass
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+def insert_on_conflict(db: AsyncSession, model):
+    """Dialect INSERT that supports .on_conflict_do_nothing() for the session's database."""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
+
+
+async def get_write_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_read_db():
+    async with ReadSessionLocal() as db:
+        yield db
+
+
+async def get_db(request: Request):
+    """Read-only session for safe methods, the single writer for everything else.
+
+    All dependencies in a request share this session, so get_current_user on a
+    GET never takes the writer connection.
+    """
+    sessionmaker_ = ReadSessionLocal if request.method in READ_METHODS else AsyncSessionLocal
+    async with sessionmaker_() as db:
         yield db
-    finally:
-        db.close()
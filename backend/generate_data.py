@@ -0,0 +1,285 @@
+"""
+Synthetic data generator — bulk-loads users, follows, posts, likes and comments
+for load testing and capacity planning.
+
+Usage (from backend/ with venv activated):
+    python generate_data.py --users 10000 --posts 100000
+    python generate_data.py --users 1000000 --posts 10000000 --seed 7
+
+Deterministic: the same --seed against the same starting database produces the
+same rows. The follow graph and author activity are power-law shaped (a few
+accounts get most of the followers and write most of the posts). Per-post likes
+and comments are heavy-tailed. Every denormalized counter is written with its
+row, so reconcile_counters.py --dry-run reports no drift afterwards.
+
+Rows are appended after the current max ids, so it can run on top of seed.py.
+All generated users share one password (--password, hashed once). Run
+rebuild_timelines.py afterwards to materialize the following-only feeds.
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+
+from database import engine, Base
+import models  # noqa: F401 — registers all ORM models
+
+from core.security import hash_password
+from models.comment import Comment
+from models.follower import Follower
+from models.like import Like
+from models.post import Post
+from models.user import User
+
+# Generated activity ends here and stretches back SPAN, so runs are reproducible
+END = datetime(2025, 1, 1)
+SPAN = timedelta(days=365)
+COMMENT_WINDOW = timedelta(days=3)
+SENTENCE_POOL = 4096
+
+# Exponents for _skewed: higher means more concentrated on the lowest ids
+FOLLOW_SKEW = 3.0
+AUTHOR_SKEW = 2.0
+
+FIRST_NAMES = [
+    "Ada", "Alan", "Amara", "Ana", "Bea", "Carlos", "Chen", "Dana", "Diego", "Eli",
+    "Fatima", "Grace", "Hiro", "Ines", "Ivan", "Jonas", "Kai", "Lea", "Leo", "Maya",
+    "Nia", "Omar", "Priya", "Quinn", "Rosa", "Sam", "Tariq", "Uma", "Vera", "Yuki",
+]
+LAST_NAMES = [
+    "Abara", "Bauer", "Costa", "Dubois", "Eriksen", "Fischer", "Garcia", "Haddad",
+    "Ito", "Jensen", "Kim", "Lopez", "Mensah", "Novak", "Okafor", "Patel", "Rossi",
+    "Silva", "Tanaka", "Usman", "Varga", "Wong", "Yilmaz", "Zhang",
+]
+WORDS = (
+    "the a to and of in is it for on that with this just my we our today new code ship "
+    "build deploy coffee team feature bug fix test query index cache feed post like "
+    "comment follow launch weekend idea design data model api fast slow latency users "
+    "growth product review merge release night morning finally again really great"
+).split()
+
+
+def _skewed(rng: random.Random, n: int, alpha: float) -> int:
+    """Index in [0, n) biased towards 0; P(index < x) = (x / n) ** (1 / alpha)."""
+    return int(n * rng.random() ** alpha)
+
+
+def _heavy_tail(rng: random.Random, mean: float) -> int:
+    """Pareto-distributed count (shape 1.5, so the mean is 3x the scale) with the given mean."""
+    if mean <= 0:
+        return 0
+    value = mean / 3 * rng.paretovariate(1.5)
+    # Stochastic rounding keeps the mean instead of truncating it away
+    return int(value + rng.random())
+
+
+def _sentence(rng: random.Random, low: int, high: int) -> str:
+    return " ".join(rng.choices(WORDS, k=rng.randint(low, high))).capitalize() + "."
+
+
+def _follow_edges(seed: int, first_id: int, count: int, mean: float):
+    """Yield (follower_id, followed_id) pairs; replaying the same seed yields the same graph."""
+    rng = random.Random(seed)
+    for offset in range(count):
+        follower_id = first_id + offset
+        wanted = min(count - 1, _heavy_tail(rng, mean))
+        targets: set[int] = set()
+        attempts = 0
+        while len(targets) < wanted:
+            attempts += 1
+            # Fall back to uniform picks so small graphs can't stall on the long tail
+            target = _skewed(rng, count, FOLLOW_SKEW) if attempts <= 4 * wanted else rng.randrange(count)
+            if first_id + target != follower_id:
+                targets.add(first_id + target)
+        for followed_id in sorted(targets):
+            yield follower_id, followed_id
+
+
+def _write(conn, batches) -> None:
+    """Insert each (model, rows) pair as one executemany, all in a single transaction."""
+    with conn.begin():
+        for model, rows in batches:
+            if rows:
+                conn.execute(insert(model), rows)
+
+
+def _drop_indexes(conn, models) -> list:
+    indexes = [index for model in models for index in model.__table__.indexes]
+    with conn.begin():
+        for index in indexes:
+            index.drop(conn, checkfirst=True)
+    return indexes
+
+
+def _max_id(conn, column) -> int:
+    return conn.scalar(select(func.max(column))) or 0
+
+
+class Progress:
+    def __init__(self, label: str, live: bool = True):
+        self.label = label
+        self.live = live
+        self.rows = 0
+        self.started = time.perf_counter()
+
+    def add(self, rows: int) -> None:
+        self.rows += rows
+        if self.live:
+            elapsed = time.perf_counter() - self.started
+            print(f"\r  {self.label:<9} {self.rows:>12,} rows  {elapsed:7.1f}s", end="", flush=True)
+
+    def done(self) -> None:
+        elapsed = time.perf_counter() - self.started
+        rate = self.rows / elapsed if elapsed else 0
+        print(f"\r  {self.label:<9} {self.rows:>12,} rows  {elapsed:7.1f}s  ({rate:,.0f} rows/s)")
+
+
+def _load_users(conn, args, rng: random.Random, first_user: int, bios: list[str], hashed: str) -> None:
+    graph_seed = rng.getrandbits(64)
+
+    # Pass 1 over the follow graph: counters only, so users are inserted complete
+    followers_count = [0] * args.users
+    following_count = [0] * args.users
+    for follower_id, followed_id in _follow_edges(graph_seed, first_user, args.users, args.follows):
+        following_count[follower_id - first_user] += 1
+        followers_count[followed_id - first_user] += 1
+
+    progress = Progress("users")
+    for start in range(0, args.users, args.batch_size):
+        rows = []
+        for offset in range(start, min(start + args.batch_size, args.users)):
+            user_id = first_user + offset
+            username = f"{args.prefix}{user_id}"
+            rows.append({
+                "id": user_id,
+                "username": username,
+                "email": f"{username}@load.cadrebook.dev",
+                "hashed_password": hashed,
+                "created_at": END - 2 * SPAN + rng.random() * SPAN,
+                "display_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                "bio": rng.choice(bios) if rng.random() < 0.3 else None,
+                "followers_count": followers_count[offset],
+                "following_count": following_count[offset],
+            })
+        _write(conn, [(User, rows)])
+        progress.add(len(rows))
+    progress.done()
+
+    # Pass 2: replay the same graph and write it
+    progress = Progress("follows")
+    batch = []
+    for follower_id, followed_id in _follow_edges(graph_seed, first_user, args.users, args.follows):
+        batch.append({"follower_id": follower_id, "followed_id": followed_id})
+        if len(batch) >= args.batch_size:
+            _write(conn, [(Follower, batch)])
+            progress.add(len(batch))
+            batch = []
+    _write(conn, [(Follower, batch)])
+    progress.add(len(batch))
+    progress.done()
+
+
+def _load_posts(conn, args, rng: random.Random, first_user: int, first_post: int) -> None:
+    post_texts = [_sentence(rng, 5, 40) for _ in range(SENTENCE_POOL)]
+    comment_texts = [_sentence(rng, 2, 20) for _ in range(SENTENCE_POOL)]
+    user_ids = range(first_user, first_user + args.users)
+
+    # Posts are written together with their likes and comments, so each post's
+    # counters are known exactly when it is inserted
+    post_progress = Progress("posts")
+    like_progress = Progress("likes", live=False)
+    comment_progress = Progress("comments", live=False)
+    for start in range(0, args.posts, args.batch_size):
+        posts, likes, comments = [], [], []
+        for offset in range(start, min(start + args.batch_size, args.posts)):
+            post_id = first_post + offset
+            created_at = END - rng.random() * SPAN
+            likers = rng.sample(user_ids, min(args.users, _heavy_tail(rng, args.likes)))
+            comment_total = _heavy_tail(rng, args.comments)
+            posts.append({
+                "id": post_id,
+                "user_id": first_user + _skewed(rng, args.users, AUTHOR_SKEW),
+                "content": rng.choice(post_texts),
+                "created_at": created_at,
+                "updated_at": created_at,
+                "likes_count": len(likers),
+                "comments_count": comment_total,
+            })
+            likes.extend({"user_id": user_id, "post_id": post_id} for user_id in likers)
+            for _ in range(comment_total):
+                comments.append({
+                    "user_id": first_user + rng.randrange(args.users),
+                    "post_id": post_id,
+                    "content": rng.choice(comment_texts),
+                    "created_at": min(END, created_at + rng.random() * COMMENT_WINDOW),
+                })
+        _write(conn, [(Post, posts), (Like, likes), (Comment, comments)])
+        post_progress.add(len(posts))
+        like_progress.add(len(likes))
+        comment_progress.add(len(comments))
+    post_progress.done()
+    like_progress.done()
+    comment_progress.done()
+
+
+def generate(args) -> None:
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(args.seed)
+    # Sampling text from a fixed pool is far cheaper per row than building it fresh
+    bios = [_sentence(rng, 4, 12) for _ in range(SENTENCE_POOL)]
+
+    with engine.connect() as conn:
+        # A big page cache keeps the growing unique indexes (likes, followers) in memory
+        conn.exec_driver_sql(f"PRAGMA cache_size = -{args.cache_mib * 1024}")
+        first_user = _max_id(conn, User.id) + 1
+        first_post = _max_id(conn, Post.id) + 1
+        conn.commit()
+
+        # Secondary indexes are cheaper to build once, sorted, than to grow row by row.
+        # Unique constraints stay in place, so duplicates still fail loudly.
+        dropped = [] if args.keep_indexes else _drop_indexes(conn, [Follower, Post, Like, Comment])
+        try:
+            _load_users(conn, args, rng, first_user, bios, hash_password(args.password))
+            _load_posts(conn, args, rng, first_user, first_post)
+        finally:
+            if dropped:
+                started = time.perf_counter()
+                with conn.begin():
+                    for index in dropped:
+                        index.create(conn, checkfirst=True)
+                print(f"  indexes   {len(dropped):>12} rebuilt {time.perf_counter() - started:6.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-generate synthetic CadreBook data.")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--posts", type=int, default=100_000)
+    parser.add_argument("--follows", type=float, default=20.0, help="mean accounts followed per user")
+    parser.add_argument("--likes", type=float, default=5.0, help="mean likes per post")
+    parser.add_argument("--comments", type=float, default=1.0, help="mean comments per post")
+    parser.add_argument("--seed", type=int, default=42, help="RNG seed; same seed, same data")
+    parser.add_argument("--batch-size", type=int, default=20_000, help="users, follows or posts per transaction")
+    parser.add_argument("--cache-mib", type=int, default=1024, help="SQLite page cache for the load connection")
+    parser.add_argument(
+        "--keep-indexes",
+        action="store_true",
+        help="maintain secondary indexes during the load instead of rebuilding them at the end",
+    )
+    parser.add_argument("--prefix", default="load", help="username prefix (usernames are <prefix><id>)")
+    parser.add_argument("--password", default="password123", help="shared password for generated users")
+    args = parser.parse_args()
+    if args.users < 1 or args.posts < 0:
+        parser.error("--users must be at least 1 and --posts non-negative")
+
+    print(f"Generating {args.users:,} users and {args.posts:,} posts (seed {args.seed})...")
+    started = time.perf_counter()
+    try:
+        generate(args)
+    except Exception as e:
+        print(f"\nGeneration failed: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"\nDone in {time.perf_counter() - started:.1f}s. Run rebuild_timelines.py for following-only feeds.")
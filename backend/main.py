@@ -1,9 +1,19 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
-from config import settings  # noqa: F401 — ensures settings load on startup
+from config import settings
+from core.admission import AdmissionMiddleware
 from core.exceptions import register_exception_handlers
-from database import Base, engine
+from core.metrics import MetricsMiddleware, registry
+from core.password_hasher import password_hasher
+from core.profiling import ProfilingMiddleware
+from core.pubsub import broker
+from core.sql_instrumentation import SQLInstrumentationMiddleware, instrument_engine
+from core.trending import STALE_SNAPSHOT_INTERVALS, trending
+from database import Base, async_engine, read_engine
 import models  # noqa: F401 — registers all ORM models before create_all
 from routers.auth import router as auth_router
 from routers.users import router as users_router
@@ -11,6 +21,9 @@ from routers.posts import router as posts_router
 from routers.likes import router as likes_router
 from routers.comments import router as comments_router
 from routers.followers import router as followers_router
+from routers.events import router as events_router
+
+logging.basicConfig(level=settings.log_level, format="%(asctime)s %(levelname)s %(name)s %(message)s")
 
 app = FastAPI(title="CadreBook API", version="1.0.0")
 
@@ -22,6 +35,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.sql_instrumentation:
+    instrument_engine(async_engine.sync_engine)
+    instrument_engine(read_engine.sync_engine)
+    app.add_middleware(SQLInstrumentationMiddleware)
+
+if settings.profiling_enabled:
+    app.add_middleware(ProfilingMiddleware)
+
+if settings.admission_enabled:
+    # Outside the rest of the stack so a shed request costs as little as possible
+    app.add_middleware(AdmissionMiddleware)
+
+if settings.metrics_enabled:
+    # Added last so it is outermost and its latency includes the other middleware
+    app.add_middleware(MetricsMiddleware)
+
 register_exception_handlers(app)
 
 app.include_router(auth_router)
@@ -30,13 +59,37 @@ app.include_router(posts_router)
 app.include_router(likes_router)
 app.include_router(comments_router)
 app.include_router(followers_router)
+app.include_router(events_router)
 
 
 @app.on_event("startup")
-def on_startup():
-    Base.metadata.create_all(bind=engine)
+async def on_startup():
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    broker.start()
+    if trending.load(settings.trending_snapshot_path, STALE_SNAPSHOT_INTERVALS * settings.trending_snapshot_seconds):
+        # Persist adopted counts under this worker's own snapshot right away
+        await trending.save(settings.trending_snapshot_path)
+    app.state.trending_snapshots = asyncio.create_task(
+        trending.run_snapshots(settings.trending_snapshot_path, settings.trending_snapshot_seconds)
+    )
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    password_hasher.shutdown()
+    broker.close()
+    app.state.trending_snapshots.cancel()
+    await trending.close(settings.trending_snapshot_path)
 
 
 @app.get("/health")
-def health_check():
+async def health_check():
     return {"status": "ok", "app": "CadreBook"}
+
+
+if settings.metrics_enabled:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        # Rendered on the event loop: the threadpool gauges read anyio's limiter for this loop
+        return Response(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
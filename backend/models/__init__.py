@@ -3,3 +3,6 @@ from models.post import Post  # noqa: F401
 from models.like import Like  # noqa: F401
 from models.comment import Comment  # noqa: F401
 from models.follower import Follower  # noqa: F401
+from models.timeline import TimelineEntry, TimelineGap  # noqa: F401
+from models.suggestion import UserSuggestion  # noqa: F401
+from models.user_search import users_fts  # noqa: F401
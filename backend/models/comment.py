@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, Text
 from sqlalchemy.orm import relationship
 
 from database import Base
@@ -8,6 +8,10 @@ from database import Base
 
 class Comment(Base):
     __tablename__ = "comments"
+    __table_args__ = (
+        # Keyset pagination within a post, in either direction, and the feed's preview window
+        Index("ix_comments_post_created_at_id", "post_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
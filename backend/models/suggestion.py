@@ -0,0 +1,19 @@
+from sqlalchemy import Column, ForeignKey, Integer
+
+from database import Base
+
+
+class UserSuggestion(Base):
+    """Precomputed "people you may know": a user's top friends-of-friends.
+
+    The primary key leads with user_id, so serving one user's list is a short
+    range scan; it is ordered at read time because incremental updates shift
+    mutual counts between full rebuilds.
+    """
+
+    __tablename__ = "user_suggestions"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    suggested_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    # Accounts the user follows that follow the suggestion
+    mutual_count = Column(Integer, nullable=False)
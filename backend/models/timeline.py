@@ -0,0 +1,37 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer
+
+from database import Base
+
+
+class TimelineEntry(Base):
+    """One row per (viewer, post) in a viewer's materialized following-only feed."""
+
+    __tablename__ = "timeline_entries"
+    __table_args__ = (
+        # Feed reads are a single range scan over the viewer's own timeline
+        Index("ix_timeline_user_created_at_post", "user_id", "created_at", "post_id"),
+        # Unfollow removes one author's entries from one viewer's timeline
+        Index("ix_timeline_user_author", "user_id", "author_id"),
+        Index("ix_timeline_post_id", "post_id"),
+    )
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True)
+    author_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+
+    # Copied from the post so the timeline can be paginated without touching posts
+    created_at = Column(DateTime, nullable=False)
+
+
+class TimelineGap(Base):
+    """An author who dropped back to fan-out after being pulled at read time.
+
+    Their followers' timelines hold none of the posts written while they were
+    pulled, so readers keep merging in the author's posts created before
+    `before` until rebuild_timelines materializes them.
+    """
+
+    __tablename__ = "timeline_gaps"
+
+    author_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    before = Column(DateTime, nullable=False)
@@ -23,7 +23,7 @@ class User(Base):
     relationship_status = Column(String(50), nullable=True)
 
     # Denormalized counts — updated atomically with their triggers
-    followers_count = Column(Integer, default=0, nullable=False)
+    followers_count = Column(Integer, default=0, nullable=False, index=True)
     following_count = Column(Integer, default=0, nullable=False)
 
     # Relationships
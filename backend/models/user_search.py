@@ -0,0 +1,54 @@
+from sqlalchemy import column, event, table
+
+from database import Base
+
+# FTS5 index over users(username, display_name). External content: the text lives in
+# `users`, the index only stores tokens. Prefix indexes make as-you-type queries cheap.
+users_fts = table("users_fts", column("rowid"))
+
+USER_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+        username, display_name,
+        content='users', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='1 2 3'
+    )
+    """,
+    # Triggers keep the index in sync with every write path (register, update_profile, deletes)
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts(rowid, username, display_name)
+        VALUES (new.id, new.username, new.display_name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, username, display_name)
+        VALUES ('delete', old.id, old.username, old.display_name);
+    END
+    """,
+    # Only fires for searchable columns, so counter updates don't churn the index
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF username, display_name ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, username, display_name)
+        VALUES ('delete', old.id, old.username, old.display_name);
+        INSERT INTO users_fts(rowid, username, display_name)
+        VALUES (new.id, new.username, new.display_name);
+    END
+    """,
+]
+
+
+@event.listens_for(Base.metadata, "after_create")
+def create_user_search_index(_target, connection, **_kw):
+    if connection.dialect.name != "sqlite":
+        return
+    existed = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users_fts'"
+    ).first()
+    for statement in USER_SEARCH_DDL:
+        connection.exec_driver_sql(statement)
+    if not existed:
+        # Index users that were created before the FTS table existed
+        connection.exec_driver_sql("INSERT INTO users_fts(users_fts) VALUES ('rebuild')")
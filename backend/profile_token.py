@@ -0,0 +1,23 @@
+"""
+Print a signed token that lets the bearer profile requests.
+
+Usage (from backend/ with venv activated):
+    python profile_token.py --minutes 15
+
+Send it as `X-Profile-Token: <token>` or `?profile_token=<token>` to a server
+running with PROFILING_ENABLED=true. The request's collapsed stacks land in
+PROFILE_DIR, named in the `X-Profile` response header; open them at
+https://www.speedscope.app or pipe them through flamegraph.pl. Anyone holding
+SECRET_KEY can mint these, and they expire like access tokens.
+"""
+
+import argparse
+
+from core.security import create_profile_token
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mint a request-profiling token.")
+    parser.add_argument("--minutes", type=int, default=15, help="token lifetime")
+    args = parser.parse_args()
+    print(create_profile_token(args.minutes))
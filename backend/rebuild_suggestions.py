@@ -0,0 +1,44 @@
+"""
+Precompute "people you may know" suggestions from the follow graph.
+
+Usage (from backend/ with venv activated):
+    python rebuild_suggestions.py
+
+Loads the whole graph into CSR arrays, ranks each user's friends-of-friends by
+mutual follows and stores the top SUGGESTION_TOP_K. Between runs a follow or
+unfollow moves the affected mutual counts by ±1; run this periodically (e.g.
+nightly) to recount entries that started at 1 or fell out of a full list.
+Safe to re-run and to run while the app is serving.
+"""
+
+import asyncio
+import sys
+import time
+
+from database import AsyncSessionLocal, engine, Base
+import models  # noqa: F401 — registers all ORM models
+
+from services.suggestion_service import rebuild_suggestions
+
+
+async def main():
+    Base.metadata.create_all(bind=engine)
+    started = time.perf_counter()
+
+    def report(last_user_id: int, written: int) -> None:
+        elapsed = time.perf_counter() - started
+        print(f"\r  users up to {last_user_id:>10,}  {written:>12,} rows  {elapsed:7.1f}s", end="", flush=True)
+
+    async with AsyncSessionLocal() as db:
+        try:
+            written = await rebuild_suggestions(db, on_batch=report)
+            print(f"\nDone — {written} suggestions written in {time.perf_counter() - started:.1f}s.")
+        except Exception as e:
+            await db.rollback()
+            print(f"\nRebuild failed: {e}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    print("Rebuilding suggestions...")
+    asyncio.run(main())
@@ -0,0 +1,37 @@
+"""
+Rebuild materialized home timelines from the follow graph.
+
+Usage (from backend/ with venv activated):
+    python rebuild_timelines.py
+
+Run once after upgrading an existing database, or any time timelines are
+suspected to be out of sync. Safe to re-run: clears and rewrites every entry.
+Also fills the gaps left by authors who dropped back to fan-out, so reads stop
+merging their older posts in.
+"""
+
+import asyncio
+import sys
+
+from database import AsyncSessionLocal, engine, Base
+import models  # noqa: F401 — registers all ORM models
+
+from services.timeline_service import rebuild_timelines
+
+
+async def main():
+    Base.metadata.create_all(bind=engine)
+
+    async with AsyncSessionLocal() as db:
+        try:
+            written = await rebuild_timelines(db)
+            print(f"Done — {written} timeline entries written.")
+        except Exception as e:
+            await db.rollback()
+            print(f"\nRebuild failed: {e}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    print("Rebuilding timelines...")
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+"""
+Reconcile denormalized counters with the rows they count.
+
+Recomputes posts.likes_count, posts.comments_count, users.followers_count and
+users.following_count from likes, comments and followers. Works through each
+table in id-range chunks with a commit per chunk, so it can run against a live
+database without holding the write lock for long.
+
+Running servers keep post and author records and principals in memory. They
+serve the corrected counts once those entries expire, within
+OBJECT_CACHE_TTL_SECONDS and PRINCIPAL_CACHE_TTL_SECONDS.
+
+Usage (from backend/ with venv activated):
+    python reconcile_counters.py                      # fix drift
+    python reconcile_counters.py --dry-run            # only report it
+    python reconcile_counters.py --chunk-size 2000 --pause 0.05
+"""
+
+import argparse
+import asyncio
+import sys
+
+from database import AsyncSessionLocal
+import models  # noqa: F401 — registers all ORM models
+
+from services.reconcile_service import reconcile_counters
+
+
+async def main(chunk_size: int, pause: float, dry_run: bool, verbose: bool):
+    async with AsyncSessionLocal() as db:
+        try:
+            report = await reconcile_counters(db, chunk_size=chunk_size, pause=pause, dry_run=dry_run)
+        except Exception as e:
+            await db.rollback()
+            print(f"\nReconcile failed: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    for chunk in report.chunks:
+        if verbose or chunk.drifted:
+            print(
+                f"  {chunk.table:<6} ids {chunk.start_id:>9}-{chunk.end_id:<9} "
+                f"drifted {chunk.drifted:>6}  {chunk.seconds * 1000:8.1f} ms"
+            )
+    verb = "drifted" if dry_run else "fixed"
+    print(
+        f"\nDone — {report.drifted('posts')} posts and {report.drifted('users')} users {verb} "
+        f"in {len(report.chunks)} chunks ({report.seconds:.2f}s)."
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconcile denormalized counters.")
+    parser.add_argument("--chunk-size", type=int, default=5_000, help="rows per transaction")
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds to sleep between chunks")
+    parser.add_argument("--dry-run", action="store_true", help="report drift without writing")
+    parser.add_argument("--verbose", action="store_true", help="print every chunk, not just drifted ones")
+    args = parser.parse_args()
+    print("Reconciling counters...")
+    asyncio.run(main(args.chunk_size, args.pause, args.dry_run, args.verbose))
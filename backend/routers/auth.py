@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.dependencies import get_current_user
-from database import get_db
-from models.user import User
+from core.principal_cache import UserSnapshot
+from database import get_db, get_read_db
 from schemas.user import AuthResponse, UserCreate, UserLogin, UserResponse
 from services.auth_service import login_user, register_user
 
@@ -11,15 +11,15 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/register", response_model=AuthResponse, status_code=status.HTTP_201_CREATED)
-def register(data: UserCreate, db: Session = Depends(get_db)):
-    return register_user(db, data)
+async def register(data: UserCreate, db: AsyncSession = Depends(get_db)):
+    return await register_user(db, data)
 
 
 @router.post("/login", response_model=AuthResponse)
-def login(data: UserLogin, db: Session = Depends(get_db)):
-    return login_user(db, data.username, data.password)
+async def login(data: UserLogin, db: AsyncSession = Depends(get_read_db)):
+    return await login_user(db, data.username, data.password)
 
 
 @router.get("/me", response_model=UserResponse)
-def me(current_user: User = Depends(get_current_user)):
+async def me(current_user: UserSnapshot = Depends(get_current_user)):
     return current_user
@@ -1,22 +1,36 @@
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from typing import Literal
 
+from fastapi import APIRouter, Depends, Header, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.conditional import conditional
 from core.dependencies import get_current_user
+from core.principal_cache import UserSnapshot
 from database import get_db
-from models.user import User
-from schemas.comment import CommentCreate, CommentResponse
+from schemas.comment import CommentCreate, CommentPage, CommentResponse
 from services.comment_service import add_comment, delete_comment, get_comments
 
 router = APIRouter(tags=["comments"])
 
 
-@router.get("/posts/{post_id}/comments", response_model=list[CommentResponse])
-def list_comments(
+@router.get("/posts/{post_id}/comments", response_model=CommentPage)
+async def list_comments(
     post_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    order: Literal["oldest", "newest"] = "oldest",
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
-    return get_comments(db, post_id)
+    return conditional(await get_comments(
+        db,
+        post_id,
+        cursor=cursor,
+        limit=limit,
+        newest_first=order == "newest",
+        if_none_match=if_none_match,
+    ))
 
 
 @router.post(
@@ -24,19 +38,19 @@ def list_comments(
     response_model=CommentResponse,
     status_code=status.HTTP_201_CREATED,
 )
-def create_comment(
+async def create_comment(
     post_id: int,
     data: CommentCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
-    return add_comment(db, post_id, current_user, data)
+    return await add_comment(db, post_id, current_user, data)
 
 
 @router.delete("/comments/{comment_id}", status_code=status.HTTP_204_NO_CONTENT)
-def remove_comment(
+async def remove_comment(
     comment_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
-    delete_comment(db, comment_id, current_user)
+    await delete_comment(db, comment_id, current_user)
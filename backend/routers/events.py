@@ -0,0 +1,102 @@
+import asyncio
+
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+
+from config import settings
+from core.dependencies import authenticate_token
+from core.exceptions import TooManyTopicsError, UnauthorizedError
+from core.pubsub import Subscription, author_topic, broker, post_topic
+from schemas.event import EventSubscription
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+RESYNC = b'{"type":"resync"}'
+
+
+def _topics(subscription: EventSubscription) -> set[str]:
+    topics = {post_topic(post_id) for post_id in subscription.posts}
+    topics.update(author_topic(user_id) for user_id in subscription.authors)
+    if len(topics) > settings.event_max_topics:
+        raise TooManyTopicsError(settings.event_max_topics)
+    return topics
+
+
+async def _sse(topics: set[str]):
+    # Subscribed only once the body starts, so a client gone before then leaves nothing behind
+    subscription = broker.subscription()
+    broker.set_topics(subscription, topics)
+    try:
+        yield b"retry: 3000\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(subscription.get(), settings.event_heartbeat_seconds)
+            except asyncio.TimeoutError:
+                # Comment lines keep proxies from closing an idle stream
+                yield b": ping\n\n"
+                continue
+            if message is None:
+                yield b"data: " + RESYNC + b"\n\n"
+                return
+            yield b"data: " + message + b"\n\n"
+    finally:
+        broker.remove(subscription)
+
+
+@router.get("")
+async def stream_events(
+    access_token: str,
+    posts: list[int] = Query([]),
+    authors: list[int] = Query([]),
+):
+    """Server-sent events for `?posts=1&posts=2&authors=3`. Reconnect to change the set."""
+    topics = _topics(EventSubscription(posts=posts, authors=authors))
+    if await authenticate_token(access_token) is None:
+        raise UnauthorizedError()
+
+    return StreamingResponse(
+        _sse(topics),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _pump(websocket: WebSocket, subscription: Subscription) -> None:
+    while (message := await subscription.get()) is not None:
+        await websocket.send_text(message.decode("utf-8"))
+    await websocket.send_text(RESYNC.decode())
+    await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+
+
+@router.websocket("/ws")
+async def events_socket(websocket: WebSocket, access_token: str):
+    """Live updates over a WebSocket.
+
+    Send `{"posts": [...], "authors": [...]}` whenever what's on screen
+    changes; each message replaces the previous subscription.
+    """
+    if await authenticate_token(access_token) is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+
+    subscription = broker.subscription()
+    pump = asyncio.create_task(_pump(websocket, subscription))
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message["code"], message.get("reason"))
+            try:
+                # Parsing and validating in one step also rejects frames that aren't JSON
+                data = message.get("text") or message.get("bytes") or ""
+                broker.set_topics(subscription, _topics(EventSubscription.model_validate_json(data)))
+            except (ValidationError, TooManyTopicsError) as e:
+                detail = e.message if isinstance(e, TooManyTopicsError) else "Expected {posts: [...], authors: [...]}"
+                await websocket.send_json({"type": "error", "detail": detail})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        pump.cancel()
+        broker.remove(subscription)
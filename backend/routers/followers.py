@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.dependencies import get_current_user, get_db
-from models.user import User
+from core.principal_cache import UserSnapshot
 from schemas.follower import FollowResponse
 from services.follower_service import follow_user, unfollow_user
 
@@ -10,18 +10,18 @@ router = APIRouter(prefix="/users", tags=["followers"])
 
 
 @router.post("/{username}/follow", response_model=FollowResponse)
-def follow(
+async def follow(
     username: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
-    return follow_user(db, current_user, username)
+    return await follow_user(db, current_user, username)
 
 
 @router.delete("/{username}/follow", response_model=FollowResponse)
-def unfollow(
+async def unfollow(
     username: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
-    return unfollow_user(db, current_user, username)
+    return await unfollow_user(db, current_user, username)
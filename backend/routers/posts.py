@@ -1,75 +1,125 @@
-from fastapi import APIRouter, Depends
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Header, Query
 from fastapi import status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.conditional import conditional
 from core.dependencies import get_current_user
+from core.principal_cache import UserSnapshot
 from core.exceptions import UnauthorizedError
 from database import get_db
-from models.user import User
-from schemas.post import PostCreate, PostResponse, PostUpdate
+from schemas.post import NormalizedPostPage, PostCreate, PostPage, PostResponse, PostUpdate, TrendingPost
 from services.post_service import (
     create_post,
     delete_post,
     get_feed,
+    get_trending,
     get_user_posts,
     update_post,
 )
 
 router = APIRouter(prefix="/posts", tags=["posts"])
 
+PayloadFormat = Literal["nested", "normalized"]
+FIELDS_DESCRIPTION = "Comma-separated post fields for format=normalized; id and user_id are always included"
+
 
-def _optional_user(
-    db: Session = Depends(get_db),
+async def _optional_user(
+    db: AsyncSession = Depends(get_db),
     # Try to get current user but don't fail if unauthenticated
-) -> User | None:
+) -> UserSnapshot | None:
     return None
 
 
-@router.get("/feed", response_model=list[PostResponse])
-def feed(
-    skip: int = 0,
-    limit: int = 20,
+@router.get("/feed", response_model=PostPage | NormalizedPostPage)
+async def feed(
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
     following: bool = False,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    sort: Literal["recent", "ranked"] = "recent",
+    include_comment_preview: int = Query(0, ge=0, le=10),
+    payload_format: PayloadFormat = Query("nested", alias="format"),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    if_none_match: str | None = Header(None),
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Newest first, or `sort=ranked` for engagement, author affinity and recency combined.
+
+    `format=normalized` lists each author once in `users` instead of inside every post.
+    """
+    return conditional(await get_feed(
+        db,
+        current_user_id=current_user.id,
+        cursor=cursor,
+        limit=limit,
+        following_only=following,
+        comment_preview=include_comment_preview,
+        if_none_match=if_none_match,
+        sort=sort,
+        payload_format=payload_format,
+        fields=fields,
+    ))
+
+
+@router.get("/trending", response_model=list[TrendingPost])
+async def trending_posts(
+    window: Literal["1h", "24h"] = "1h",
+    limit: int = Query(20, ge=1, le=50),
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
-    return get_feed(db, current_user_id=current_user.id, skip=skip, limit=limit, following_only=following)
+    """Posts with the most likes and comments in the last hour or day."""
+    return await get_trending(db, current_user.id, window, limit)
 
 
-@router.get("/user/{username}", response_model=list[PostResponse])
-def user_posts(
+@router.get("/user/{username}", response_model=PostPage | NormalizedPostPage)
+async def user_posts(
     username: str,
-    skip: int = 0,
-    limit: int = 20,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    payload_format: PayloadFormat = Query("nested", alias="format"),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    if_none_match: str | None = Header(None),
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
-    return get_user_posts(db, username, current_user_id=current_user.id, skip=skip, limit=limit)
+    return conditional(await get_user_posts(
+        db,
+        username,
+        current_user_id=current_user.id,
+        cursor=cursor,
+        limit=limit,
+        if_none_match=if_none_match,
+        payload_format=payload_format,
+        fields=fields,
+    ))
 
 
 @router.post("", response_model=PostResponse, status_code=status.HTTP_201_CREATED)
-def create(
+async def create(
     data: PostCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
-    return create_post(db, current_user, data)
+    return await create_post(db, current_user, data)
 
 
 @router.put("/{post_id}", response_model=PostResponse)
-def update(
+async def update(
     post_id: int,
     data: PostUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
-    return update_post(db, post_id, current_user, data)
+    return await update_post(db, post_id, current_user, data)
 
 
 @router.delete("/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete(
+async def delete(
     post_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
-    delete_post(db, post_id, current_user)
+    await delete_post(db, post_id, current_user)
@@ -1,39 +1,74 @@
 from typing import Optional
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.conditional import conditional
 from core.dependencies import get_current_user, get_optional_current_user
-from database import get_db
-from models.user import User
-from schemas.user import ProfileResponse, ProfileUpdate, UserSearchResult
+from core.principal_cache import UserSnapshot
+from database import ReadSessionLocal, get_db
+from schemas.user import ProfileResponse, ProfileUpdate, SuggestionResult, UserSearchPage
+from services.export_service import export_user_data
+from services.suggestion_service import get_suggestions
 from services.user_service import get_profile, search_users, update_profile
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
-@router.get("/search", response_model=list[UserSearchResult])
-def search(
+@router.get("/search", response_model=UserSearchPage)
+async def search(
     q: str = "",
-    db: Session = Depends(get_db),
-    current_user: User | None = Depends(get_optional_current_user),
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot | None = Depends(get_optional_current_user),
 ):
-    return search_users(db, q, current_user_id=current_user.id if current_user else None)
+    return await search_users(
+        db, q, current_user_id=current_user.id if current_user else None, cursor=cursor, limit=limit
+    )
+
+
+@router.get("/me/suggestions", response_model=list[SuggestionResult])
+async def my_suggestions(
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    return await get_suggestions(db, current_user.id, limit=limit)
+
+
+@router.get("/me/export")
+async def export_my_data(current_user: UserSnapshot = Depends(get_current_user)):
+    return StreamingResponse(
+        export_user_data(ReadSessionLocal, current_user.id),
+        media_type="application/x-ndjson",
+        headers={
+            "Content-Disposition": f'attachment; filename="cadrebook-{current_user.username}.ndjson"',
+            "Cache-Control": "no-store",
+        },
+    )
 
 
 @router.get("/{username}", response_model=ProfileResponse)
-def get_user_profile(
+async def get_user_profile(
     username: str,
-    db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_optional_current_user),
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: Optional[UserSnapshot] = Depends(get_optional_current_user),
 ):
-    return get_profile(db, username, current_user_id=current_user.id if current_user else None)
+    return conditional(await get_profile(
+        db,
+        username,
+        current_user_id=current_user.id if current_user else None,
+        if_none_match=if_none_match,
+    ))
 
 
 @router.put("/me/profile", response_model=ProfileResponse)
-def update_my_profile(
+async def update_my_profile(
     data: ProfileUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
-    return update_profile(db, current_user, data)
+    return await update_profile(db, current_user, data)
@@ -34,3 +34,9 @@ class CommentResponse(BaseModel):
     content: str
     created_at: datetime
     author: CommentAuthor | None = None
+
+
+class CommentPage(BaseModel):
+    items: list[CommentResponse]
+    next_cursor: str | None = None
+    has_more: bool = False
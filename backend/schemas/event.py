@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+
+class EventSubscription(BaseModel):
+    """Posts and authors a client has on screen. Each message replaces the previous set."""
+
+    posts: list[int] = []
+    authors: list[int] = []
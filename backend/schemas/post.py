@@ -1,7 +1,10 @@
 from datetime import datetime
+from typing import Any
 
 from pydantic import BaseModel, ConfigDict, field_validator
 
+from schemas.comment import CommentPage
+
 
 class PostCreate(BaseModel):
     content: str
@@ -51,3 +54,42 @@ class PostResponse(BaseModel):
     liked_by_me: bool = False
     user_id: int
     author: PostAuthor | None = None
+    # Only set when the feed is asked for include_comment_preview
+    comment_preview: CommentPage | None = None
+
+
+class TrendingPost(PostResponse):
+    # Likes plus weighted comments in the requested window (approximate, never under)
+    engagement: int
+
+
+class PostPage(BaseModel):
+    items: list[PostResponse]
+    next_cursor: str | None = None
+    has_more: bool = False
+
+
+# Post fields a normalized page can carry; `id` and `user_id` are always sent
+NORMALIZED_POST_FIELDS = (
+    "id",
+    "user_id",
+    "content",
+    "created_at",
+    "updated_at",
+    "likes_count",
+    "comments_count",
+    "liked_by_me",
+    "comment_preview",
+)
+
+
+class NormalizedPostPage(BaseModel):
+    """format=normalized: each author appears once in `users`, keyed by id; posts refer to it by user_id.
+
+    Posts carry the fields named in `?fields=` (all of NORMALIZED_POST_FIELDS by default).
+    """
+
+    posts: list[dict[str, Any]]
+    users: dict[int, PostAuthor]
+    next_cursor: str | None = None
+    has_more: bool = False
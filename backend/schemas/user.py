@@ -121,3 +121,19 @@ class UserSearchResult(BaseModel):
     display_name: str | None
     followers_count: int = 0
     is_following: bool = False
+
+
+class SuggestionResult(BaseModel):
+    id: int
+    username: str
+    display_name: str | None
+    followers_count: int = 0
+    # Accounts the viewer follows that follow this user; 0 for popular-account fallbacks
+    mutual_count: int = 0
+    is_following: bool = False
+
+
+class UserSearchPage(BaseModel):
+    items: list[UserSearchResult]
+    next_cursor: str | None = None
+    has_more: bool = False
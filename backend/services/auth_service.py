@@ -1,38 +1,54 @@
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.exceptions import (
     EmailAlreadyExistsError,
     InvalidCredentialsError,
     UsernameAlreadyExistsError,
 )
-from core.security import create_access_token, hash_password, verify_password
+from core.password_hasher import password_hasher
+from core.security import create_access_token
 from models.user import User
 from schemas.user import AuthResponse, UserCreate, UserResponse
 
 
-def register_user(db: Session, data: UserCreate) -> AuthResponse:
-    if db.scalar(select(User).where(User.username == data.username)):
+async def _check_available(db: AsyncSession, data: UserCreate) -> None:
+    if await db.scalar(select(User.id).where(User.username == data.username)):
         raise UsernameAlreadyExistsError()
-    if db.scalar(select(User).where(User.email == data.email)):
+    if await db.scalar(select(User.id).where(User.email == data.email)):
         raise EmailAlreadyExistsError()
 
+
+async def register_user(db: AsyncSession, data: UserCreate) -> AuthResponse:
+    # Duplicates are rejected before they take a slot on the hashing executor
+    await _check_available(db, data)
+    # Nothing is written yet; end the read so bcrypt never runs while holding the writer connection
+    await db.rollback()
+    hashed_password = await password_hasher.hash(data.password)
+
     user = User(
         username=data.username,
         email=data.email,
-        hashed_password=hash_password(data.password),
+        hashed_password=hashed_password,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Another registration took the username or email while this one was hashing
+        await db.rollback()
+        await _check_available(db, data)
+        raise
+    await db.refresh(user)
 
     token = create_access_token(user.id)
     return AuthResponse(access_token=token, user=UserResponse.model_validate(user))
 
 
-def login_user(db: Session, username: str, password: str) -> AuthResponse:
-    user = db.scalar(select(User).where(User.username == username.lower().strip()))
-    if user is None or not verify_password(password, user.hashed_password):
+async def login_user(db: AsyncSession, username: str, password: str) -> AuthResponse:
+    user = await db.scalar(select(User).where(User.username == username.lower().strip()))
+    if user is None or not await password_hasher.verify(password, user.hashed_password):
         raise InvalidCredentialsError()
 
     token = create_access_token(user.id)
@@ -1,11 +1,18 @@
-from sqlalchemy import select, asc
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import asc, desc, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
+from core.conditional import Versioned, etag_matches, make_etag
 from core.exceptions import CommentNotFoundError, ForbiddenError, PostNotFoundError
+from core.pagination import decode_cursor, encode_cursor
+from core.object_cache import post_cache
+from core.principal_cache import UserSnapshot
+from core.pubsub import broker, post_topic
+from core.trending import COMMENT_WEIGHT, trending
 from models.comment import Comment
 from models.post import Post
 from models.user import User
-from schemas.comment import CommentAuthor, CommentCreate, CommentResponse
+from schemas.comment import CommentAuthor, CommentCreate, CommentPage, CommentResponse
 
 
 def _to_response(comment: Comment) -> CommentResponse:
@@ -28,48 +35,160 @@ def _to_response(comment: Comment) -> CommentResponse:
     )
 
 
-def get_comments(db: Session, post_id: int) -> list[CommentResponse]:
-    post = db.get(Post, post_id)
-    if post is None:
+# Column-only projection for listings; author names come from the join
+_LIST_COLUMNS = (
+    Comment.id,
+    Comment.post_id,
+    Comment.user_id,
+    Comment.content,
+    Comment.created_at,
+    User.username,
+    User.display_name,
+)
+
+
+def _row_to_response(row) -> CommentResponse:
+    return CommentResponse(
+        id=row.id,
+        post_id=row.post_id,
+        user_id=row.user_id,
+        content=row.content,
+        created_at=row.created_at,
+        author=CommentAuthor(id=row.user_id, username=row.username, display_name=row.display_name),
+    )
+
+
+def _page_of(rows: list, limit: int) -> CommentPage:
+    """Build a page from up to limit + 1 rows; the extra row only signals has_more."""
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return CommentPage(
+        items=[_row_to_response(r) for r in rows],
+        next_cursor=encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None,
+        has_more=has_more,
+    )
+
+
+def _rows_version(rows: list, limit: int) -> tuple:
+    # Comments are never edited, so ids plus the authors' names version a page
+    return (
+        len(rows) > limit,
+        [(r.id, r.username, r.display_name) for r in rows[:limit]],
+    )
+
+
+def page_version(page: CommentPage) -> tuple:
+    """_rows_version of a page that is already built, such as a feed's comment preview."""
+    return (
+        page.has_more,
+        [(c.id, c.author.username, c.author.display_name) for c in page.items],
+    )
+
+
+async def get_comments(
+    db: AsyncSession,
+    post_id: int,
+    cursor: str | None = None,
+    limit: int = 20,
+    newest_first: bool = False,
+    if_none_match: str | None = None,
+) -> Versioned[CommentPage]:
+    if await db.scalar(select(Post.id).where(Post.id == post_id)) is None:
         raise PostNotFoundError()
 
-    comments = db.scalars(
-        select(Comment)
-        .options(joinedload(Comment.user))
-        .where(Comment.post_id == post_id)
-        .order_by(asc(Comment.created_at))
-    ).all()
-    return [_to_response(c) for c in comments]
+    position = tuple_(Comment.created_at, Comment.id)
+    query = select(*_LIST_COLUMNS).join(User, User.id == Comment.user_id).where(Comment.post_id == post_id)
+    if cursor:
+        after = decode_cursor(cursor)
+        query = query.where(position < after if newest_first else position > after)
+    order = (desc(Comment.created_at), desc(Comment.id)) if newest_first else (asc(Comment.created_at), asc(Comment.id))
+    rows = (await db.execute(query.order_by(*order).limit(limit + 1))).all()
+
+    # Versioned from the raw rows so a 304 never builds the response models
+    etag = make_etag(post_id, newest_first, _rows_version(rows, limit))
+    if etag_matches(if_none_match, etag):
+        return Versioned(etag)
+    return Versioned(etag, _page_of(rows, limit))
+
+
+async def get_comment_previews(db: AsyncSession, post_ids: list[int], limit: int) -> dict[int, CommentPage]:
+    """First `limit` comments of every post in one windowed query.
+
+    The window only ranks (post_id, created_at, id), which the comments index
+    covers, so content and authors are read for the surviving rows alone. Each
+    preview's next_cursor continues GET /posts/{id}/comments in oldest-first order.
+    """
+    if not post_ids or limit <= 0:
+        return {}
+    ranked = (
+        select(
+            Comment.id,
+            func.row_number().over(
+                partition_by=Comment.post_id,
+                order_by=(asc(Comment.created_at), asc(Comment.id)),
+            ).label("position"),
+        )
+        .where(Comment.post_id.in_(post_ids))
+        .subquery()
+    )
+    rows = (await db.execute(
+        select(*_LIST_COLUMNS)
+        .join(ranked, ranked.c.id == Comment.id)
+        .join(User, User.id == Comment.user_id)
+        .where(ranked.c.position <= limit + 1)
+        .order_by(Comment.post_id, ranked.c.position)
+    )).all()
+
+    by_post: dict[int, list] = {post_id: [] for post_id in post_ids}
+    for row in rows:
+        by_post[row.post_id].append(row)
+    return {post_id: _page_of(post_rows, limit) for post_id, post_rows in by_post.items()}
 
 
-def add_comment(db: Session, post_id: int, user: User, data: CommentCreate) -> CommentResponse:
-    post = db.get(Post, post_id)
+async def add_comment(db: AsyncSession, post_id: int, user: UserSnapshot, data: CommentCreate) -> CommentResponse:
+    post = await db.get(Post, post_id)
     if post is None:
         raise PostNotFoundError()
 
     comment = Comment(user_id=user.id, post_id=post_id, content=data.content)
     db.add(comment)
     post.comments_count += 1
-    db.commit()
-    db.refresh(comment)
+    await db.commit()
+    post_cache.invalidate(post_id)
+    await db.refresh(comment)
 
     # Reload with author join
-    comment = db.scalar(
+    comment = await db.scalar(
         select(Comment)
         .options(joinedload(Comment.user))
         .where(Comment.id == comment.id)
     )
-    return _to_response(comment)
+    response = _to_response(comment)
+    trending.record(post_id, COMMENT_WEIGHT)
+    broker.publish([post_topic(post_id)], {
+        "type": "comment",
+        "post_id": post_id,
+        "comments_count": post.comments_count,
+        "comment": response.model_dump(mode="json"),
+    })
+    return response
 
 
-def delete_comment(db: Session, comment_id: int, current_user: User) -> None:
-    comment = db.get(Comment, comment_id)
+async def delete_comment(db: AsyncSession, comment_id: int, current_user: UserSnapshot) -> None:
+    comment = await db.get(Comment, comment_id)
     if comment is None:
         raise CommentNotFoundError()
     if comment.user_id != current_user.id:
         raise ForbiddenError()
-    post = db.get(Post, comment.post_id)
-    db.delete(comment)
+    post = await db.get(Post, comment.post_id)
+    await db.delete(comment)
     if post:
         post.comments_count = max(0, post.comments_count - 1)
-    db.commit()
+    await db.commit()
+    post_cache.invalidate(comment.post_id)
+    broker.publish([post_topic(comment.post_id)], {
+        "type": "comment_deleted",
+        "post_id": comment.post_id,
+        "comment_id": comment_id,
+        "comments_count": post.comments_count if post else 0,
+    })
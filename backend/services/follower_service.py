@@ -1,77 +1,110 @@
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import case, delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.exceptions import ForbiddenError, UserNotFoundError
+from core.principal_cache import UserSnapshot, principal_cache
+from database import insert_on_conflict
 from models.follower import Follower
 from models.user import User
 from schemas.follower import FollowResponse
+from services.ranking_service import score_inputs_cache
+from services.suggestion_service import apply_follow
+from services.timeline_service import backfill_author, remove_author, resume_fan_out
 
 
-def follow_user(db: Session, current_user: User, username: str) -> FollowResponse:
-    target = db.scalar(select(User).where(User.username == username.lower()))
-    if target is None:
+async def _resolve_target(db: AsyncSession, current_user: UserSnapshot, username: str) -> int:
+    target_id = await db.scalar(select(User.id).where(User.username == username.lower()))
+    if target_id is None:
         raise UserNotFoundError()
-    if target.id == current_user.id:
+    if target_id == current_user.id:
         raise ForbiddenError()
+    return target_id
 
-    existing = db.scalar(
-        select(Follower).where(
-            Follower.follower_id == current_user.id,
-            Follower.followed_id == target.id,
+
+async def _apply_counts(db: AsyncSession, follower_id: int, followed_id: int, delta: int) -> FollowResponse:
+    """Move both users' counters in one UPDATE ... RETURNING and build the response."""
+    rows = (await db.execute(
+        update(User)
+        .where(User.id.in_([follower_id, followed_id]))
+        .values(
+            followers_count=User.followers_count + case((User.id == followed_id, delta), else_=0),
+            following_count=User.following_count + case((User.id == follower_id, delta), else_=0),
         )
-    )
-    if existing:
-        # already following — idempotent
-        return FollowResponse(
-            following=True,
-            followers_count=target.followers_count,
-            following_count=current_user.following_count,
+        .returning(User.id, User.followers_count, User.following_count)
+        .execution_options(synchronize_session=False)
+    )).all()
+    return _to_response(rows, follower_id, followed_id, following=delta > 0)
+
+
+async def _current_counts(db: AsyncSession, follower_id: int, followed_id: int, following: bool) -> FollowResponse:
+    rows = (await db.execute(
+        select(User.id, User.followers_count, User.following_count).where(
+            User.id.in_([follower_id, followed_id])
         )
+    )).all()
+    return _to_response(rows, follower_id, followed_id, following)
+
 
-    db.add(Follower(follower_id=current_user.id, followed_id=target.id))
-    target.followers_count += 1
-    current_user.following_count += 1
-    db.commit()
-    db.refresh(target)
-    db.refresh(current_user)
+def _to_response(rows, follower_id: int, followed_id: int, following: bool) -> FollowResponse:
+    by_id = {row.id: row for row in rows}
     return FollowResponse(
-        following=True,
-        followers_count=target.followers_count,
-        following_count=current_user.following_count,
+        following=following,
+        followers_count=by_id[followed_id].followers_count,
+        following_count=by_id[follower_id].following_count,
     )
 
 
-def unfollow_user(db: Session, current_user: User, username: str) -> FollowResponse:
-    target = db.scalar(select(User).where(User.username == username.lower()))
-    if target is None:
-        raise UserNotFoundError()
-    if target.id == current_user.id:
-        raise ForbiddenError()
+async def follow_user(db: AsyncSession, current_user: UserSnapshot, username: str) -> FollowResponse:
+    target_id = await _resolve_target(db, current_user, username)
 
-    existing = db.scalar(
-        select(Follower).where(
+    inserted = await db.scalar(
+        insert_on_conflict(db, Follower)
+        .values(follower_id=current_user.id, followed_id=target_id)
+        .on_conflict_do_nothing(index_elements=["follower_id", "followed_id"])
+        .returning(Follower.id)
+    )
+    if inserted is None:
+        # already following — idempotent
+        return await _current_counts(db, current_user.id, target_id, following=True)
+
+    response = await _apply_counts(db, current_user.id, target_id, delta=1)
+    await backfill_author(db, current_user.id, target_id, response.followers_count)
+    await apply_follow(db, current_user.id, target_id, delta=1)
+    await db.commit()
+    principal_cache.invalidate_user(current_user.id)
+    principal_cache.invalidate_user(target_id)
+    score_inputs_cache.invalidate_user(current_user.id)
+    return response
+
+
+async def unfollow_user(db: AsyncSession, current_user: UserSnapshot, username: str) -> FollowResponse:
+    target_id = await _resolve_target(db, current_user, username)
+
+    deleted = await db.scalar(
+        delete(Follower)
+        .where(
             Follower.follower_id == current_user.id,
-            Follower.followed_id == target.id,
+            Follower.followed_id == target_id,
         )
+        .returning(Follower.id)
     )
-    if existing:
-        db.delete(existing)
-        target.followers_count = max(0, target.followers_count - 1)
-        current_user.following_count = max(0, current_user.following_count - 1)
-        db.commit()
-        db.refresh(target)
-        db.refresh(current_user)
+    if deleted is None:
+        return await _current_counts(db, current_user.id, target_id, following=False)
 
-    return FollowResponse(
-        following=False,
-        followers_count=target.followers_count,
-        following_count=current_user.following_count,
-    )
+    response = await _apply_counts(db, current_user.id, target_id, delta=-1)
+    await remove_author(db, current_user.id, target_id)
+    await resume_fan_out(db, target_id, response.followers_count)
+    await apply_follow(db, current_user.id, target_id, delta=-1)
+    await db.commit()
+    principal_cache.invalidate_user(current_user.id)
+    principal_cache.invalidate_user(target_id)
+    score_inputs_cache.invalidate_user(current_user.id)
+    return response
 
 
-def is_following(db: Session, follower_id: int, followed_id: int) -> bool:
-    return db.scalar(
-        select(Follower).where(
+async def is_following(db: AsyncSession, follower_id: int, followed_id: int) -> bool:
+    return await db.scalar(
+        select(Follower.id).where(
             Follower.follower_id == follower_id,
             Follower.followed_id == followed_id,
         )
@@ -1,32 +1,74 @@
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.exceptions import PostNotFoundError
+from core.object_cache import POST_COLUMNS, PostRecord, post_cache
+from core.pubsub import broker, post_topic
+from core.trending import trending
+from database import insert_on_conflict
 from models.like import Like
 from models.post import Post
 from schemas.like import LikeResponse
+from services.ranking_service import score_inputs_cache
 
 
-def toggle_like(db: Session, user_id: int, post_id: int) -> LikeResponse:
-    """Atomically like or unlike a post, keeping likes_count in sync."""
-    post = db.get(Post, post_id)
-    if post is None:
-        from core.exceptions import PostNotFoundError
+async def _current_state(db: AsyncSession, post_id: int) -> LikeResponse:
+    likes_count = await db.scalar(select(Post.likes_count).where(Post.id == post_id))
+    if likes_count is None:
         raise PostNotFoundError()
+    return LikeResponse(post_id=post_id, likes_count=likes_count, liked_by_me=False)
 
-    existing = db.scalar(
-        select(Like).where(Like.user_id == user_id, Like.post_id == post_id)
-    )
 
-    if existing:
-        # Unlike — remove the row and decrement count atomically
-        db.delete(existing)
-        post.likes_count = max(0, post.likes_count - 1)
-        liked = False
+async def toggle_like(db: AsyncSession, user_id: int, post_id: int) -> LikeResponse:
+    """Like or unlike a post with set-based statements, keeping likes_count in sync.
+
+    The row change decides the direction and the counter moves in the database,
+    so concurrent toggles can't lose an update the way a Python-side += could.
+    The counter and the side effects only follow a row that really changed.
+    """
+    try:
+        inserted = await db.scalar(
+            insert_on_conflict(db, Like)
+            .values(user_id=user_id, post_id=post_id)
+            .on_conflict_do_nothing(index_elements=["user_id", "post_id"])
+            .returning(Like.id)
+        )
+    except IntegrityError:
+        # Foreign key violation — the post doesn't exist
+        await db.rollback()
+        raise PostNotFoundError()
+
+    if inserted is None:
+        # Already liked — unlike
+        deleted = await db.scalar(
+            delete(Like)
+            .where(Like.user_id == user_id, Like.post_id == post_id)
+            .returning(Like.id)
+        )
+        if deleted is None:
+            # A concurrent unlike removed the row first; it also moved the counter
+            return await _current_state(db, post_id)
+        delta, liked = -1, False
     else:
-        # Like — add the row and increment count atomically
-        db.add(Like(user_id=user_id, post_id=post_id))
-        post.likes_count += 1
-        liked = True
+        delta, liked = 1, True
 
-    db.commit()
-    return LikeResponse(post_id=post_id, likes_count=post.likes_count, liked_by_me=liked)
+    # The whole row comes back so the cached copy is replaced rather than dropped
+    row = (await db.execute(
+        update(Post)
+        .where(Post.id == post_id)
+        .values(likes_count=Post.likes_count + delta)
+        .returning(*POST_COLUMNS)
+    )).first()
+    if row is None:
+        # Deleted between the like change and the counter update
+        await db.rollback()
+        raise PostNotFoundError()
+    await db.commit()
+    post_cache.put(post_id, PostRecord(*row))
+    likes_count = row.likes_count
+    score_inputs_cache.invalidate_user(user_id)
+    if liked:
+        trending.record_like(user_id, post_id)
+    broker.publish([post_topic(post_id)], {"type": "like", "post_id": post_id, "likes_count": likes_count})
+    return LikeResponse(post_id=post_id, likes_count=likes_count, liked_by_me=liked)
@@ -1,22 +1,47 @@
-from sqlalchemy import select, desc
-from sqlalchemy.orm import Session, joinedload
+from typing import Callable
 
-from core.exceptions import ForbiddenError, PostNotFoundError
-from models.follower import Follower
+from sqlalchemy import Select, select, desc, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from core.conditional import Versioned, etag_matches, make_etag
+from core.exceptions import ForbiddenError, InvalidFieldsError, PostNotFoundError
+from core.object_cache import AUTHOR_COLUMNS, POST_COLUMNS, AuthorRecord, PostRecord, author_cache, post_cache
+from core.pagination import decode_cursor, decode_rank_cursor, encode_cursor, encode_rank_cursor
+from core.principal_cache import UserSnapshot
+from core.pubsub import author_topic, broker, post_topic
+from core.trending import trending
 from models.like import Like
 from models.post import Post
 from models.user import User
-from schemas.post import PostAuthor, PostCreate, PostResponse, PostUpdate
+from schemas.comment import CommentPage
+from schemas.post import (
+    NORMALIZED_POST_FIELDS,
+    PostAuthor,
+    PostCreate,
+    PostPage,
+    PostResponse,
+    PostUpdate,
+    TrendingPost,
+)
+from services.comment_service import get_comment_previews, page_version
+from services.ranking_service import ranked_positions
+from services.timeline_service import fan_out_post, remove_post, timeline_positions
 
 
-def _to_response(post: Post, liked_post_ids: set[int] | None = None) -> PostResponse:
+def _to_response(
+    post: Post | PostRecord,
+    author: User | AuthorRecord | None,
+    liked_post_ids: set[int] | None = None,
+    comment_preview: CommentPage | None = None,
+) -> PostResponse:
     author = (
         PostAuthor(
-            id=post.user.id,
-            username=post.user.username,
-            display_name=post.user.display_name,
+            id=author.id,
+            username=author.username,
+            display_name=author.display_name,
         )
-        if post.user
+        if author
         else None
     )
     return PostResponse(
@@ -29,23 +54,24 @@ def _to_response(post: Post, liked_post_ids: set[int] | None = None) -> PostResp
         liked_by_me=(post.id in liked_post_ids) if liked_post_ids is not None else False,
         user_id=post.user_id,
         author=author,
+        comment_preview=comment_preview,
     )
 
 
-def _liked_post_ids(db: Session, user_id: int | None, post_ids: list[int]) -> set[int]:
+async def _liked_post_ids(db: AsyncSession, user_id: int | None, post_ids: list[int]) -> set[int]:
     if not user_id or not post_ids:
         return set()
-    rows = db.scalars(
+    rows = (await db.scalars(
         select(Like.post_id).where(
             Like.user_id == user_id,
             Like.post_id.in_(post_ids),
         )
-    ).all()
+    )).all()
     return set(rows)
 
 
-def _get_post_with_author(db: Session, post_id: int) -> Post:
-    post = db.scalar(
+async def _get_post_with_author(db: AsyncSession, post_id: int) -> Post:
+    post = await db.scalar(
         select(Post).options(joinedload(Post.user)).where(Post.id == post_id)
     )
     if post is None:
@@ -53,64 +79,255 @@ def _get_post_with_author(db: Session, post_id: int) -> Post:
     return post
 
 
-def create_post(db: Session, user: User, data: PostCreate) -> PostResponse:
+async def _hydrate(db: AsyncSession, post_ids: list[int]) -> list[tuple[PostRecord, AuthorRecord | None]]:
+    """Posts and their authors in `post_ids` order, skipping deleted posts.
+
+    Served from the object cache; misses are fetched together, at most one
+    query for posts (with their authors) and one for authors still missing.
+    """
+    # Taken before any query: a write committed while one runs must win over its rows
+    post_since, author_since = post_cache.generation, author_cache.generation
+    posts, missing = post_cache.get_many(post_ids)
+    if missing:
+        rows = (await db.execute(
+            select(*POST_COLUMNS, *AUTHOR_COLUMNS).join(User, User.id == Post.user_id).where(Post.id.in_(missing))
+        )).all()
+        split = len(POST_COLUMNS)
+        for row in rows:
+            post, author = PostRecord(*row[:split]), AuthorRecord(*row[split:])
+            post_cache.fill(post.id, post, post_since)
+            author_cache.fill(author.id, author, author_since)
+            posts[post.id] = post
+
+    authors, missing = author_cache.get_many({post.user_id for post in posts.values()})
+    if missing:
+        for row in (await db.execute(select(*AUTHOR_COLUMNS).where(User.id.in_(missing)))).all():
+            author = AuthorRecord(*row)
+            author_cache.fill(author.id, author, author_since)
+            authors[author.id] = author
+    return [(posts[i], authors.get(posts[i].user_id)) for i in post_ids if i in posts]
+
+
+async def _seek(db: AsyncSession, query: Select, cursor: str | None, limit: int) -> list[int]:
+    """Post ids past the cursor on (created_at, id), plus one extra to derive has_more."""
+    if cursor:
+        created_at, post_id = decode_cursor(cursor)
+        query = query.where(tuple_(Post.created_at, Post.id) < (created_at, post_id))
+    query = query.order_by(desc(Post.created_at), desc(Post.id)).limit(limit + 1)
+    return list((await db.scalars(query)).all())
+
+
+async def _seek_timeline(db: AsyncSession, current_user_id: int, cursor: str | None, limit: int) -> list[int]:
+    after = decode_cursor(cursor) if cursor else None
+    positions = await timeline_positions(db, current_user_id, after, limit + 1)
+    return [post_id for _, post_id in positions]
+
+
+def _time_cursor(post: PostRecord) -> str:
+    return encode_cursor(post.created_at, post.id)
+
+
+async def _seek_ranked(
+    db: AsyncSession, current_user_id: int, cursor: str | None, limit: int, following_only: bool
+) -> tuple[list[int], Callable]:
+    """Post ids in ranked order, plus the cursor builder carrying (anchor, score, id)."""
+    after = decode_rank_cursor(cursor, 3) if cursor else None
+    anchor, positions = await ranked_positions(db, current_user_id, after, limit + 1, following_only)
+    score_of = {post_id: score for score, post_id in positions}
+    return [post_id for _, post_id in positions], lambda post: encode_rank_cursor(anchor, score_of[post.id], post.id)
+
+
+def _normalized_fields(payload_format: str, fields: str | None) -> tuple[str, ...] | None:
+    """Post fields for a normalized page, or None for the default nested shape."""
+    if payload_format != "normalized":
+        if fields:
+            raise InvalidFieldsError("fields= requires format=normalized")
+        return None
+    if not fields:
+        return NORMALIZED_POST_FIELDS
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = sorted(requested.difference(NORMALIZED_POST_FIELDS))
+    if unknown:
+        raise InvalidFieldsError(
+            f"Unknown field(s) {', '.join(unknown)}; choose from {', '.join(NORMALIZED_POST_FIELDS)}"
+        )
+    requested.update(("id", "user_id"))
+    return tuple(name for name in NORMALIZED_POST_FIELDS if name in requested)
+
+
+def _normalized_page(
+    entries: list[tuple[PostRecord, AuthorRecord | None]],
+    liked: set[int],
+    previews: dict[int, CommentPage],
+    fields: tuple[str, ...],
+    next_cursor: str | None,
+    has_more: bool,
+) -> dict:
+    """A NormalizedPostPage as plain dicts; pydantic-core writes it without building models."""
+    posts, users = [], {}
+    for post, author in entries:
+        values = {
+            "id": post.id,
+            "user_id": post.user_id,
+            "content": post.content,
+            "created_at": post.created_at,
+            "updated_at": post.updated_at,
+            "likes_count": post.likes_count,
+            "comments_count": post.comments_count,
+            "liked_by_me": post.id in liked,
+            "comment_preview": previews.get(post.id),
+        }
+        posts.append({name: values[name] for name in fields})
+        if author is not None and author.id not in users:
+            users[author.id] = {"id": author.id, "username": author.username, "display_name": author.display_name}
+    return {"posts": posts, "users": users, "next_cursor": next_cursor, "has_more": has_more}
+
+
+async def _to_page(
+    db: AsyncSession,
+    post_ids: list[int],
+    current_user_id: int | None,
+    limit: int,
+    if_none_match: str | None,
+    comment_preview: int = 0,
+    cursor_for: Callable = _time_cursor,
+    fields: tuple[str, ...] | None = None,
+) -> Versioned[PostPage | dict]:
+    """Build a page from up to limit + 1 ordered post ids; the extra id only signals has_more.
+
+    With `fields` the page is normalized (see NormalizedPostPage) instead of nested.
+    """
+    has_more = len(post_ids) > limit
+    entries = await _hydrate(db, post_ids[:limit])
+    post_ids = [post.id for post, _ in entries]
+    # Previews are needed for the ETag anyway: a commenter renaming changes the page
+    previews = await get_comment_previews(db, post_ids, comment_preview)
+    # updated_at moves on edits; the counters are hashed too because reconcile corrects them
+    # without touching updated_at. The viewer's own like moves likes_count.
+    etag = make_etag(
+        current_user_id,
+        has_more,
+        [(post.id, post.updated_at, post.likes_count, post.comments_count,
+          author and author.username, author and author.display_name)
+         for post, author in entries],
+        comment_preview,
+        [(post_id, page_version(page)) for post_id, page in previews.items()],
+        fields,
+    )
+    if etag_matches(if_none_match, etag):
+        return Versioned(etag)
+
+    liked = await _liked_post_ids(db, current_user_id, post_ids)
+    next_cursor = cursor_for(entries[-1][0]) if has_more and entries else None
+    if fields is not None:
+        return Versioned(etag, _normalized_page(entries, liked, previews, fields, next_cursor, has_more))
+    return Versioned(etag, PostPage(
+        items=[_to_response(post, author, liked, previews.get(post.id)) for post, author in entries],
+        next_cursor=next_cursor,
+        has_more=has_more,
+    ))
+
+
+async def create_post(db: AsyncSession, user: UserSnapshot, data: PostCreate) -> PostResponse:
     post = Post(user_id=user.id, content=data.content)
     db.add(post)
-    db.commit()
-    db.refresh(post)
-    return _to_response(_get_post_with_author(db, post.id))
+    await db.flush()  # assigns id and created_at for the timeline fan-out
+    await fan_out_post(db, post, user.id)
+    await db.commit()
+    await db.refresh(post)
+    post = await _get_post_with_author(db, post.id)
+    post_cache.put(post.id, PostRecord.from_post(post))
+    response = _to_response(post, post.user)
+    broker.publish([author_topic(user.id)], {"type": "post_created", "post": response.model_dump(mode="json")})
+    return response
 
 
-def get_feed(
-    db: Session,
+async def get_feed(
+    db: AsyncSession,
     current_user_id: int | None = None,
-    skip: int = 0,
+    cursor: str | None = None,
     limit: int = 20,
     following_only: bool = False,
-) -> list[PostResponse]:
-    query = select(Post).options(joinedload(Post.user))
-    if following_only and current_user_id:
-        query = query.join(Post.user).join(
-            Follower,
-            (Follower.followed_id == Post.user_id) & (Follower.follower_id == current_user_id),
-        )
-    query = query.order_by(desc(Post.created_at)).offset(skip).limit(limit)
-    posts = db.scalars(query).all()
-    liked = _liked_post_ids(db, current_user_id, [p.id for p in posts])
-    return [_to_response(p, liked) for p in posts]
-
-
-def get_user_posts(
-    db: Session, username: str, current_user_id: int | None = None, skip: int = 0, limit: int = 20
-) -> list[PostResponse]:
-    posts = db.scalars(
-        select(Post)
-        .join(Post.user)
-        .options(joinedload(Post.user))
-        .where(User.username == username.lower())
-        .order_by(desc(Post.created_at))
-        .offset(skip)
-        .limit(limit)
-    ).all()
-    liked = _liked_post_ids(db, current_user_id, [p.id for p in posts])
-    return [_to_response(p, liked) for p in posts]
-
-
-def update_post(db: Session, post_id: int, current_user: User, data: PostUpdate) -> PostResponse:
-    post = _get_post_with_author(db, post_id)
+    comment_preview: int = 0,
+    if_none_match: str | None = None,
+    sort: str = "recent",
+    payload_format: str = "nested",
+    fields: str | None = None,
+) -> Versioned[PostPage | dict]:
+    post_fields = _normalized_fields(payload_format, fields)
+    cursor_for = _time_cursor
+    if sort == "ranked" and current_user_id:
+        post_ids, cursor_for = await _seek_ranked(db, current_user_id, cursor, limit, following_only)
+    elif following_only and current_user_id:
+        post_ids = await _seek_timeline(db, current_user_id, cursor, limit)
+    else:
+        post_ids = await _seek(db, select(Post.id), cursor, limit)
+    return await _to_page(
+        db, post_ids, current_user_id, limit, if_none_match, comment_preview, cursor_for, post_fields
+    )
+
+
+async def get_trending(
+    db: AsyncSession,
+    current_user_id: int | None,
+    window: str,
+    limit: int = 20,
+) -> list[TrendingPost]:
+    """The most engaged-with posts in `window`, ranked in memory by core/trending.py.
+
+    Posts come from the object cache, or from the database by primary key.
+    """
+    engagement = dict(trending.top(window, limit))
+    entries = await _hydrate(db, list(engagement))
+    liked = await _liked_post_ids(db, current_user_id, [post.id for post, _ in entries])
+    return [
+        TrendingPost(**_to_response(post, author, liked).model_dump(), engagement=engagement[post.id])
+        for post, author in entries
+    ]
+
+
+async def get_user_posts(
+    db: AsyncSession,
+    username: str,
+    current_user_id: int | None = None,
+    cursor: str | None = None,
+    limit: int = 20,
+    if_none_match: str | None = None,
+    payload_format: str = "nested",
+    fields: str | None = None,
+) -> Versioned[PostPage | dict]:
+    post_fields = _normalized_fields(payload_format, fields)
+    author_id = await db.scalar(select(User.id).where(User.username == username.lower()))
+    post_ids = []
+    if author_id is not None:
+        post_ids = await _seek(db, select(Post.id).where(Post.user_id == author_id), cursor, limit)
+    return await _to_page(db, post_ids, current_user_id, limit, if_none_match, fields=post_fields)
+
+
+async def update_post(db: AsyncSession, post_id: int, current_user: UserSnapshot, data: PostUpdate) -> PostResponse:
+    post = await _get_post_with_author(db, post_id)
     if post.user_id != current_user.id:
         raise ForbiddenError()
     post.content = data.content
-    db.commit()
-    db.refresh(post)
-    return _to_response(_get_post_with_author(db, post.id))
+    await db.commit()
+    await db.refresh(post)
+    post = await _get_post_with_author(db, post.id)
+    post_cache.put(post.id, PostRecord.from_post(post))
+    return _to_response(post, post.user)
 
 
-def delete_post(db: Session, post_id: int, current_user: User) -> None:
-    post = db.get(Post, post_id)
+async def delete_post(db: AsyncSession, post_id: int, current_user: UserSnapshot) -> None:
+    post = await db.get(Post, post_id)
     if post is None:
         raise PostNotFoundError()
     if post.user_id != current_user.id:
         raise ForbiddenError()
-    db.delete(post)
-    db.commit()
+    await remove_post(db, post.id)
+    await db.delete(post)
+    await db.commit()
+    post_cache.invalidate(post_id)
+    trending.discard(post_id)
+    broker.publish(
+        [post_topic(post_id), author_topic(current_user.id)],
+        {"type": "post_deleted", "post_id": post_id, "user_id": current_user.id},
+    )
@@ -0,0 +1,105 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.comment import Comment
+from models.follower import Follower
+from models.like import Like
+from models.post import Post
+from models.user import User
+
+
+@dataclass(slots=True)
+class ChunkReport:
+    table: str
+    start_id: int
+    end_id: int
+    drifted: int
+    seconds: float
+
+
+@dataclass(slots=True)
+class ReconcileReport:
+    chunks: list[ChunkReport] = field(default_factory=list)
+
+    def drifted(self, table: str | None = None) -> int:
+        return sum(c.drifted for c in self.chunks if table is None or c.table == table)
+
+    @property
+    def seconds(self) -> float:
+        return sum(c.seconds for c in self.chunks)
+
+
+def _post_counts():
+    likes = select(func.count(Like.id)).where(Like.post_id == Post.id).scalar_subquery()
+    comments = select(func.count(Comment.id)).where(Comment.post_id == Post.id).scalar_subquery()
+    drift = or_(Post.likes_count != likes, Post.comments_count != comments)
+    # Set explicitly so the column's onupdate doesn't mark a corrected post as edited
+    return {"likes_count": likes, "comments_count": comments, "updated_at": Post.updated_at}, drift
+
+
+def _user_counts():
+    followers = select(func.count(Follower.id)).where(Follower.followed_id == User.id).scalar_subquery()
+    following = select(func.count(Follower.id)).where(Follower.follower_id == User.id).scalar_subquery()
+    drift = or_(User.followers_count != followers, User.following_count != following)
+    return {"followers_count": followers, "following_count": following}, drift
+
+
+async def _reconcile_table(
+    db: AsyncSession,
+    report: ReconcileReport,
+    model,
+    counts_and_drift,
+    chunk_size: int,
+    pause: float,
+    dry_run: bool,
+) -> None:
+    """Recompute one table's counters in id-range chunks, one short transaction each.
+
+    Only rows whose stored counts differ are written, so a healthy table costs
+    reads only.
+    """
+    values, drift = counts_and_drift()
+    max_id = await db.scalar(select(func.max(model.id))) or 0
+
+    for start in range(1, max_id + 1, chunk_size):
+        end = start + chunk_size
+        in_chunk = (model.id >= start) & (model.id < end)
+        started = time.perf_counter()
+        if dry_run:
+            drifted = await db.scalar(select(func.count()).select_from(model).where(in_chunk, drift))
+        else:
+            ids = (await db.scalars(
+                update(model)
+                .where(in_chunk, drift)
+                .values(**values)
+                .returning(model.id)
+                .execution_options(synchronize_session=False)
+            )).all()
+            await db.commit()
+            drifted = len(ids)
+        report.chunks.append(
+            ChunkReport(model.__tablename__, start, end - 1, drifted, time.perf_counter() - started)
+        )
+        if pause:
+            # Give other writers a turn between chunks
+            await asyncio.sleep(pause)
+
+
+async def reconcile_counters(
+    db: AsyncSession, chunk_size: int = 5_000, pause: float = 0.0, dry_run: bool = False
+) -> ReconcileReport:
+    """Recompute likes_count, comments_count, followers_count and following_count
+    from the likes, comments and followers tables.
+
+    This usually runs in its own process, so it can't reach the servers'
+    in-memory post and principal caches. They pick up the corrected counts
+    when their entries expire.
+    """
+    report = ReconcileReport()
+    await _reconcile_table(db, report, Post, _post_counts, chunk_size, pause, dry_run)
+    await _reconcile_table(db, report, User, _user_counts, chunk_size, pause, dry_run)
+    return report
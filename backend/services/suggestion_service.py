@@ -0,0 +1,274 @@
+import heapq
+from array import array
+from collections import Counter
+from itertools import chain
+from typing import Callable
+
+from sqlalchemy import delete, desc, exists, func, insert, literal, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from config import settings
+from database import insert_on_conflict
+from models.follower import Follower
+from models.suggestion import UserSuggestion
+from models.user import User
+from schemas.user import SuggestionResult
+
+_RESULT_COLUMNS = (User.id, User.username, User.display_name, User.followers_count)
+
+
+class FollowGraph:
+    """The follow graph in compressed sparse row (CSR) form, indexed by user id.
+
+    The accounts user `u` follows are `targets[offsets[u]:offsets[u + 1]]`. Two
+    int arrays hold the whole graph at 4 bytes per edge (plus 4 per user), where
+    a dict of sets would spend well over 100.
+    """
+
+    def __init__(self, offsets: array, targets: array, in_degree: array):
+        self.offsets = offsets
+        self.targets = targets
+        self.in_degree = in_degree
+        self._targets = memoryview(targets)
+
+    @classmethod
+    def from_sorted_edges(cls, followers: array, targets: array, max_user_id: int) -> "FollowGraph":
+        """Build from parallel edge arrays sorted by follower id."""
+        size = max_user_id + 1
+        offsets = array("i", bytes(4 * (size + 1)))
+        in_degree = array("i", bytes(4 * size))
+        for follower_id in followers:
+            offsets[follower_id + 1] += 1
+        for followed_id in targets:
+            in_degree[followed_id] += 1
+        for user_id in range(size):
+            offsets[user_id + 1] += offsets[user_id]
+        return cls(offsets, targets, in_degree)
+
+    @property
+    def max_user_id(self) -> int:
+        return len(self.offsets) - 2
+
+    def following(self, user_id: int) -> memoryview:
+        if user_id > self.max_user_id:
+            return self._targets[0:0]
+        return self._targets[self.offsets[user_id]:self.offsets[user_id + 1]]
+
+
+def rank_candidates(graph: FollowGraph, user_id: int, top_k: int) -> list[tuple[int, int]]:
+    """Top `top_k` (candidate_id, mutual_count) pairs two hops from `user_id`.
+
+    A candidate's score is how many of the user's follows follow it. Ties go to
+    the more-followed account, then the lower id, matching the trim in
+    apply_follow and the serving order.
+    """
+    following = graph.following(user_id)
+    if not following:
+        return []
+    # Counter over the concatenated neighbour slices counts in C, not per edge in Python
+    mutual = Counter(chain.from_iterable(graph.following(v) for v in following))
+    mutual.pop(user_id, None)
+    for followed_id in following:
+        mutual.pop(followed_id, None)
+    in_degree = graph.in_degree
+    return heapq.nlargest(top_k, mutual.items(), key=lambda item: (item[1], in_degree[item[0]], -item[0]))
+
+
+def _rows(user_id: int, ranked) -> list[dict]:
+    return [
+        {"user_id": user_id, "suggested_id": suggested_id, "mutual_count": mutual_count}
+        for suggested_id, mutual_count in ranked
+    ]
+
+
+async def load_follow_graph(db: AsyncSession) -> FollowGraph:
+    max_user_id = await db.scalar(select(func.max(User.id))) or 0
+    followers, targets = array("i"), array("i")
+    # The (follower_id, followed_id) unique index returns edges already in CSR order
+    result = await db.stream(
+        select(Follower.follower_id, Follower.followed_id)
+        .order_by(Follower.follower_id, Follower.followed_id)
+        .execution_options(yield_per=50_000)
+    )
+    async for rows in result.partitions():
+        for follower_id, followed_id in rows:
+            followers.append(follower_id)
+            targets.append(followed_id)
+    return FollowGraph.from_sorted_edges(followers, targets, max_user_id)
+
+
+async def rebuild_suggestions(
+    db: AsyncSession,
+    batch_size: int = 5_000,
+    on_batch: Callable[[int, int], None] | None = None,
+) -> int:
+    """Recompute every user's suggestions from the full graph; returns rows written.
+
+    Users are processed in id ranges of `batch_size`, each replaced in its own
+    transaction, so readers never see a user's list empty for long.
+    """
+    graph = await load_follow_graph(db)
+    written = 0
+    for low in range(1, graph.max_user_id + 1, batch_size):
+        high = min(low + batch_size, graph.max_user_id + 1)
+        rows = []
+        for user_id in range(low, high):
+            rows.extend(_rows(user_id, rank_candidates(graph, user_id, settings.suggestion_top_k)))
+        await db.execute(delete(UserSuggestion).where(UserSuggestion.user_id.between(low, high - 1)))
+        if rows:
+            await db.execute(insert(UserSuggestion), rows)
+        await db.commit()
+        written += len(rows)
+        if on_batch:
+            on_batch(high - 1, written)
+    return written
+
+
+def _list_size(user_id):
+    return select(func.count()).where(UserSuggestion.user_id == user_id).scalar_subquery()
+
+
+async def _trim(db: AsyncSession, user_id: int) -> None:
+    """Drop whatever ranks below the top K of one user's list."""
+    overflow = (
+        select(UserSuggestion.suggested_id)
+        .join(User, User.id == UserSuggestion.suggested_id)
+        .where(UserSuggestion.user_id == user_id)
+        .order_by(desc(UserSuggestion.mutual_count), desc(User.followers_count), User.id)
+        .offset(settings.suggestion_top_k)
+    )
+    await db.execute(
+        delete(UserSuggestion).where(UserSuggestion.user_id == user_id, UserSuggestion.suggested_id.in_(overflow))
+    )
+
+
+async def _shift_actor(db: AsyncSession, actor_id: int, target_id: int, delta: int) -> None:
+    """The actor's own list: everyone the target follows gains or loses one mutual."""
+    targets_follows = select(Follower.followed_id).where(Follower.follower_id == target_id)
+    await db.execute(
+        update(UserSuggestion)
+        .where(UserSuggestion.user_id == actor_id, UserSuggestion.suggested_id.in_(targets_follows))
+        .values(mutual_count=UserSuggestion.mutual_count + delta)
+    )
+    if delta > 0:
+        # Now followed, so no longer a suggestion; the target's follows that are new to the list enter at 1
+        await db.execute(
+            delete(UserSuggestion).where(UserSuggestion.user_id == actor_id, UserSuggestion.suggested_id == target_id)
+        )
+        actor_follows = select(Follower.followed_id).where(Follower.follower_id == actor_id)
+        listed = select(UserSuggestion.suggested_id).where(UserSuggestion.user_id == actor_id)
+        await db.execute(
+            insert(UserSuggestion).from_select(
+                ["user_id", "suggested_id", "mutual_count"],
+                select(literal(actor_id), User.id, literal(1))
+                .where(
+                    User.id.in_(targets_follows),
+                    User.id != actor_id,
+                    User.id.not_in(actor_follows),
+                    User.id.not_in(listed),
+                )
+                .order_by(desc(User.followers_count), User.id)
+                .limit(settings.suggestion_top_k),
+            )
+        )
+    else:
+        await db.execute(
+            delete(UserSuggestion).where(UserSuggestion.user_id == actor_id, UserSuggestion.mutual_count <= 0)
+        )
+        # The target is a candidate again, scored by the actor's follows that follow it:
+        # one (follower_id, followed_id) index probe per account the actor follows
+        mine, theirs = aliased(Follower), aliased(Follower)
+        mutual = await db.scalar(
+            select(func.count())
+            .select_from(mine)
+            .join(theirs, theirs.follower_id == mine.followed_id)
+            .where(mine.follower_id == actor_id, theirs.followed_id == target_id)
+        )
+        if mutual:
+            await db.execute(
+                insert(UserSuggestion).values(user_id=actor_id, suggested_id=target_id, mutual_count=mutual)
+            )
+    await _trim(db, actor_id)
+
+
+async def _shift_audience(db: AsyncSession, actor_id: int, target_id: int, delta: int) -> None:
+    """The actor's followers: the target gains or loses one mutual in each of their lists."""
+    if delta > 0:
+        viewer, follows_target = aliased(Follower), aliased(Follower)
+        listed = exists().where(
+            UserSuggestion.user_id == viewer.follower_id, UserSuggestion.suggested_id == target_id
+        )
+        await db.execute(
+            insert_on_conflict(db, UserSuggestion)
+            .from_select(
+                ["user_id", "suggested_id", "mutual_count"],
+                select(viewer.follower_id, literal(target_id), literal(1)).where(
+                    viewer.followed_id == actor_id,
+                    viewer.follower_id != target_id,
+                    ~exists().where(
+                        follows_target.follower_id == viewer.follower_id,
+                        follows_target.followed_id == target_id,
+                    ),
+                    # A new entry has the lowest possible count, so it only joins a list with room
+                    or_(listed, _list_size(viewer.follower_id) < settings.suggestion_top_k),
+                ),
+            )
+            .on_conflict_do_update(
+                index_elements=["user_id", "suggested_id"],
+                set_={"mutual_count": UserSuggestion.mutual_count + 1},
+            )
+        )
+    else:
+        audience = select(Follower.follower_id).where(Follower.followed_id == actor_id)
+        await db.execute(
+            update(UserSuggestion)
+            .where(UserSuggestion.user_id.in_(audience), UserSuggestion.suggested_id == target_id)
+            .values(mutual_count=UserSuggestion.mutual_count - 1)
+        )
+        await db.execute(
+            delete(UserSuggestion).where(
+                UserSuggestion.user_id.in_(audience),
+                UserSuggestion.suggested_id == target_id,
+                UserSuggestion.mutual_count <= 0,
+            )
+        )
+
+
+async def apply_follow(db: AsyncSession, actor_id: int, target_id: int, delta: int) -> None:
+    """Update suggestions after `actor_id` follows (delta=1) or unfollows (delta=-1) `target_id`.
+
+    Only the pairs whose mutual count the edge changes are touched, by ±1:
+    the actor's entries for everyone the target follows, and the target's
+    entry in each of the actor's followers' lists. Every statement is bounded
+    by those two sets, so nothing walks two hops on the write path. Lists
+    stay within SUGGESTION_TOP_K. An account that enters a list starts at 1,
+    and one that dropped out of a full list loses its count; the periodic
+    rebuild_suggestions.py run recounts both. Accounts above
+    SUGGESTION_FANOUT_MAX_FOLLOWERS skip the follower fan-out.
+    """
+    await _shift_actor(db, actor_id, target_id, delta)
+    # Read in this transaction: the cached principal's count can be stale
+    followers_count = await db.scalar(select(User.followers_count).where(User.id == actor_id))
+    if followers_count is not None and followers_count <= settings.suggestion_fanout_max_followers:
+        await _shift_audience(db, actor_id, target_id, delta)
+
+
+async def get_suggestions(db: AsyncSession, user_id: int, limit: int = 10) -> list[SuggestionResult]:
+    rows = (await db.execute(
+        select(*_RESULT_COLUMNS, UserSuggestion.mutual_count)
+        .join(UserSuggestion, UserSuggestion.suggested_id == User.id)
+        .where(UserSuggestion.user_id == user_id)
+        .order_by(desc(UserSuggestion.mutual_count), desc(User.followers_count), User.id)
+        .limit(limit)
+    )).all()
+    if not rows:
+        # No friends-of-friends yet (new or isolated account): suggest the most-followed accounts
+        followed = select(Follower.followed_id).where(Follower.follower_id == user_id)
+        rows = (await db.execute(
+            select(*_RESULT_COLUMNS)
+            .where(User.id != user_id, User.id.not_in(followed))
+            .order_by(desc(User.followers_count), User.id)
+            .limit(limit)
+        )).all()
+    return [SuggestionResult(**row._mapping) for row in rows]
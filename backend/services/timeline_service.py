@@ -0,0 +1,154 @@
+from datetime import datetime
+
+from sqlalchemy import delete, desc, insert, literal, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from database import insert_on_conflict
+from models.follower import Follower
+from models.post import Post
+from models.timeline import TimelineEntry, TimelineGap
+from models.user import User
+
+
+def _is_pulled(followers_count: int) -> bool:
+    """Authors with very large audiences are merged in at read time rather than fanned out."""
+    return followers_count > settings.timeline_fanout_max_followers
+
+
+async def fan_out_post(db: AsyncSession, post: Post, author_id: int) -> None:
+    """Append a new post to every follower's timeline in one INSERT ... SELECT."""
+    # Read in this transaction: a cached snapshot's count can sit on the wrong side of the threshold
+    followers_count = await db.scalar(select(User.followers_count).where(User.id == author_id))
+    if followers_count is None or _is_pulled(followers_count):
+        return
+    await db.execute(
+        insert(TimelineEntry).from_select(
+            ["user_id", "post_id", "author_id", "created_at"],
+            select(
+                Follower.follower_id,
+                literal(post.id),
+                literal(author_id),
+                literal(post.created_at, TimelineEntry.created_at.type),
+            ).where(Follower.followed_id == author_id),
+        )
+    )
+
+
+async def remove_post(db: AsyncSession, post_id: int) -> None:
+    await db.execute(delete(TimelineEntry).where(TimelineEntry.post_id == post_id))
+
+
+async def backfill_author(
+    db: AsyncSession, user_id: int, author_id: int, author_followers_count: int
+) -> None:
+    """Copy an author's most recent posts into a viewer's timeline after a follow."""
+    if _is_pulled(author_followers_count):
+        return
+    recent = (
+        select(Post.id, Post.created_at)
+        .where(Post.user_id == author_id)
+        .order_by(desc(Post.created_at), desc(Post.id))
+        .limit(settings.timeline_backfill_limit)
+        .subquery()
+    )
+    await db.execute(
+        insert(TimelineEntry)
+        .from_select(
+            ["user_id", "post_id", "author_id", "created_at"],
+            select(literal(user_id), recent.c.id, literal(author_id), recent.c.created_at),
+        )
+        .prefix_with("OR IGNORE", dialect="sqlite")
+    )
+
+
+async def resume_fan_out(db: AsyncSession, author_id: int, author_followers_count: int) -> None:
+    """Record a gap when an unfollow brings an author back down to the fan-out threshold.
+
+    Nothing they posted while pulled reached their followers' timelines, so reads
+    merge in their posts older than now until rebuild_timelines fills the gap.
+    """
+    if author_followers_count != settings.timeline_fanout_max_followers:
+        return
+    stmt = insert_on_conflict(db, TimelineGap).values(author_id=author_id, before=datetime.utcnow())
+    await db.execute(
+        stmt.on_conflict_do_update(index_elements=["author_id"], set_={"before": stmt.excluded.before})
+    )
+
+
+async def remove_author(db: AsyncSession, user_id: int, author_id: int) -> None:
+    await db.execute(
+        delete(TimelineEntry).where(
+            TimelineEntry.user_id == user_id,
+            TimelineEntry.author_id == author_id,
+        )
+    )
+
+
+async def timeline_positions(
+    db: AsyncSession, user_id: int, after: tuple[datetime, int] | None, limit: int
+) -> list[tuple[datetime, int]]:
+    """Return up to `limit` (created_at, post_id) pairs from the viewer's timeline, newest first.
+
+    Materialized entries come from one range scan; posts by followed authors on the
+    pull path are merged in from their own (user_id, created_at, id) index. So are
+    posts by authors with a timeline gap, unless the materialized page is full and
+    ends after the gap.
+    """
+    query = select(TimelineEntry.created_at, TimelineEntry.post_id).where(
+        TimelineEntry.user_id == user_id
+    )
+    if after:
+        query = query.where(tuple_(TimelineEntry.created_at, TimelineEntry.post_id) < after)
+    query = query.order_by(desc(TimelineEntry.created_at), desc(TimelineEntry.post_id)).limit(limit)
+    materialized = (await db.execute(query)).all()
+    positions = {post_id: created_at for created_at, post_id in materialized}
+    # Gapped posts are all older than `before`; a full page ending after it can't include them
+    covered_until = materialized[-1][0] if len(materialized) == limit else None
+
+    pulled_ids = [
+        author_id
+        for author_id, pulled, before in (await db.execute(
+            select(
+                Follower.followed_id,
+                User.followers_count > settings.timeline_fanout_max_followers,
+                TimelineGap.before,
+            )
+            .join(User, User.id == Follower.followed_id)
+            .outerjoin(TimelineGap, TimelineGap.author_id == Follower.followed_id)
+            .where(
+                Follower.follower_id == user_id,
+                or_(
+                    User.followers_count > settings.timeline_fanout_max_followers,
+                    TimelineGap.author_id.is_not(None),
+                ),
+            )
+        )).all()
+        if pulled or covered_until is None or covered_until <= before
+    ]
+    if pulled_ids:
+        pulled = select(Post.created_at, Post.id).where(Post.user_id.in_(pulled_ids))
+        if after:
+            pulled = pulled.where(tuple_(Post.created_at, Post.id) < after)
+        pulled = pulled.order_by(desc(Post.created_at), desc(Post.id)).limit(limit)
+        positions.update({post_id: created_at for created_at, post_id in (await db.execute(pulled)).all()})
+
+    merged = sorted(((c, p) for p, c in positions.items()), reverse=True)
+    return merged[:limit]
+
+
+async def rebuild_timelines(db: AsyncSession) -> int:
+    """Rematerialize every fanned-out timeline from the follow graph; returns rows written."""
+    await db.execute(delete(TimelineEntry))
+    await db.execute(delete(TimelineGap))
+    result = await db.execute(
+        insert(TimelineEntry).from_select(
+            ["user_id", "post_id", "author_id", "created_at"],
+            select(Follower.follower_id, Post.id, Post.user_id, Post.created_at)
+            .join(Post, Post.user_id == Follower.followed_id)
+            .join(User, User.id == Follower.followed_id)
+            .where(User.followers_count <= settings.timeline_fanout_max_followers),
+        )
+    )
+    await db.commit()
+    return result.rowcount
@@ -1,79 +1,205 @@
-from sqlalchemy import or_, func, select
-from sqlalchemy.orm import Session
+import re
 
+from sqlalchemy import and_, desc, func, literal_column, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from core.conditional import Versioned, etag_matches, make_etag
 from core.exceptions import ForbiddenError, UserNotFoundError
+from core.pagination import decode_rank_cursor, encode_rank_cursor
+from core.object_cache import AuthorRecord, author_cache
+from core.principal_cache import UserSnapshot, principal_cache
 from models.user import User
-from schemas.user import ProfileResponse, ProfileUpdate, UserSearchResult
+from models.user_search import users_fts
+from schemas.user import ProfileResponse, ProfileUpdate, UserSearchPage, UserSearchResult
 from services.follower_service import is_following
 
 
-def get_profile(db: Session, username: str, current_user_id: int | None = None) -> ProfileResponse:
-    user = db.scalar(select(User).where(User.username == username.lower()))
-    if user is None:
+_PROFILE_COLUMNS = (
+    User.id,
+    User.username,
+    User.email,
+    User.created_at,
+    User.display_name,
+    User.bio,
+    User.sex,
+    User.birthday,
+    User.relationship_status,
+    User.followers_count,
+    User.following_count,
+)
+
+
+async def get_profile(
+    db: AsyncSession,
+    username: str,
+    current_user_id: int | None = None,
+    if_none_match: str | None = None,
+) -> Versioned[ProfileResponse]:
+    row = (await db.execute(
+        select(*_PROFILE_COLUMNS).where(User.username == username.lower())
+    )).first()
+    if row is None:
         raise UserNotFoundError()
-    return ProfileResponse(
-        id=user.id,
-        username=user.username,
-        email=user.email,
-        created_at=user.created_at,
-        display_name=user.display_name,
-        bio=user.bio,
-        sex=user.sex,
-        birthday=user.birthday,
-        relationship_status=user.relationship_status,
-        followers_count=user.followers_count,
-        following_count=user.following_count,
-        is_following=is_following(db, current_user_id, user.id) if current_user_id else False,
-    )
 
+    # A follow or unfollow by the viewer moves followers_count, so the row also versions is_following
+    etag = make_etag(current_user_id, tuple(row))
+    if etag_matches(if_none_match, etag):
+        return Versioned(etag)
 
-def update_profile(db: Session, current_user: User, data: ProfileUpdate) -> User:
+    return Versioned(etag, ProfileResponse(
+        **row._mapping,
+        is_following=await is_following(db, current_user_id, row.id) if current_user_id else False,
+    ))
+
+
+async def update_profile(db: AsyncSession, current_user: UserSnapshot, data: ProfileUpdate) -> User:
+    user = await db.get(User, current_user.id)
+    if user is None:
+        raise UserNotFoundError()
     update_data = data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
-        setattr(current_user, field, value)
-    db.commit()
-    db.refresh(current_user)
-    return current_user
+        setattr(user, field, value)
+    await db.commit()
+    await db.refresh(user)
+    principal_cache.invalidate_user(user.id)
+    author_cache.put(user.id, AuthorRecord.from_user(user))
+    return user
 
 
-def search_users(
-    db: Session, query: str, current_user_id: int | None = None, limit: int = 20
-) -> list[UserSearchResult]:
-    q = query.strip()
-    if not q:
-        return []
-    users = db.scalars(
-        select(User)
-        .where(
-            or_(
-                func.lower(User.username).contains(q.lower()),
-                func.lower(User.display_name).contains(q.lower()),
-            )
+def _fts_query(q: str) -> str | None:
+    """Turn free text into an FTS5 query where every word is matched as a prefix."""
+    words = re.findall(r"\w+", q)
+    if not words:
+        return None
+    return " ".join(f'"{w}"*' for w in words)
+
+
+MATCH_TIERS = (0, 1, 2)
+
+
+def _tier_filter(db: AsyncSession, tier: int, q: str):
+    """0: the exact username, 1: other usernames starting with q, 2: any other match."""
+    sqlite = db.get_bind().dialect.name == "sqlite"
+    if sqlite:
+        # Usernames are lowercase [a-z0-9_], all below "\x7f": a range the username index serves
+        prefix = and_(User.username >= q, User.username < q + "\x7f")
+    else:
+        prefix = User.username.startswith(q, autoescape=True)
+    if tier == 0:
+        return User.username == q
+    if tier == 1:
+        return and_(prefix, User.username != q)
+    if sqlite:
+        match = _fts_query(q)
+        if match is None:
+            return None
+        others = User.id.in_(
+            select(users_fts.c.rowid).where(literal_column("users_fts").op("MATCH")(match))
         )
-        .limit(limit)
-    ).all()
+    else:
+        others = or_(func.lower(User.username).contains(q), func.lower(User.display_name).contains(q))
+    return and_(others, ~prefix)
+
 
+async def _tier_matches(
+    db: AsyncSession,
+    tier: int,
+    q: str,
+    current_user_id: int | None,
+    after: tuple[int, int] | None,
+    limit: int,
+) -> list[User]:
+    """Up to `limit` users of one tier, most followed first, after the (followers_count, id) key."""
+    condition = _tier_filter(db, tier, q)
+    if condition is None:
+        return []
+    conditions = [condition]
     if current_user_id:
+        conditions.append(User.id != current_user_id)  # exclude self from results
+    if after:
+        conditions.append(tuple_(User.followers_count, User.id) < after)
+    order = (desc(User.followers_count), desc(User.id))
+
+    if tier > 0 and db.get_bind().dialect.name == "sqlite":
+        # A short query ("a", "lo") can match a large share of all users, and
+        # sorting them all dominates the query. Check the most followed users
+        # first: the followers_count index (its rowid suffix included) yields
+        # exactly this order, so its first `limit` matches are the answer.
+        walked = select(User.id).order_by(*order).limit(settings.search_candidate_limit)
+        if after:
+            walked = walked.where(tuple_(User.followers_count, User.id) < after)
+        users = (await db.scalars(
+            select(User).where(User.id.in_(walked), *conditions).order_by(*order).limit(limit)
+        )).all()
+        if len(users) == limit:
+            return users
+        # Too few among them: the query is selective, so sorting all its matches is cheap
+
+    return (await db.scalars(select(User).where(*conditions).order_by(*order).limit(limit))).all()
+
+
+async def search_users(
+    db: AsyncSession,
+    query: str,
+    current_user_id: int | None = None,
+    cursor: str | None = None,
+    limit: int = 20,
+) -> UserSearchPage:
+    """Rank matches as exact username, then username prefix, then any other word prefix,
+    most-followed first within each tier, and seek on that key for pagination.
+
+    Each tier is its own query, read only while the page still has room, so
+    every match is reachable and an exact username always comes first.
+    """
+    q = query.strip().lower()
+    if not q:
+        return UserSearchPage(items=[])
+
+    after = decode_rank_cursor(cursor, 3) if cursor else None
+    rows: list[tuple[User, int]] = []
+    for tier in MATCH_TIERS:
+        if after and tier < after[0]:
+            continue
+        tier_after = (-after[1], -after[2]) if after and tier == after[0] else None
+        users = await _tier_matches(db, tier, q, current_user_id, tier_after, limit + 1 - len(rows))
+        rows.extend((u, tier) for u in users)
+        if len(rows) > limit:
+            break
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    users = [u for u, _ in rows]
+
+    if current_user_id and users:
         from models.follower import Follower
         followed_ids = set(
-            db.scalars(
+            (await db.scalars(
                 select(Follower.followed_id).where(
                     Follower.follower_id == current_user_id,
                     Follower.followed_id.in_([u.id for u in users]),
                 )
-            ).all()
+            )).all()
         )
     else:
         followed_ids = set()
 
-    return [
-        UserSearchResult(
-            id=u.id,
-            username=u.username,
-            display_name=u.display_name,
-            followers_count=u.followers_count,
-            is_following=u.id in followed_ids,
-        )
-        for u in users
-        if u.id != current_user_id  # exclude self from results
-    ]
+    next_cursor = None
+    if has_more:
+        last_user, last_tier = rows[-1]
+        next_cursor = encode_rank_cursor(last_tier, -last_user.followers_count, -last_user.id)
+
+    return UserSearchPage(
+        items=[
+            UserSearchResult(
+                id=u.id,
+                username=u.username,
+                display_name=u.display_name,
+                followers_count=u.followers_count,
+                is_following=u.id in followed_ids,
+            )
+            for u in users
+        ],
+        next_cursor=next_cursor,
+        has_more=has_more,
+    )
@@ -1,5 +1,6 @@
 import api from './axios'
 
-export const getComments = (postId) => api.get(`/posts/${postId}/comments`)
+export const getComments = (postId, cursor = null, limit = 20) =>
+  api.get(`/posts/${postId}/comments`, { params: { limit, ...(cursor ? { cursor } : {}) } })
 export const addComment = (postId, data) => api.post(`/posts/${postId}/comments`, data)
 export const deleteComment = (commentId) => api.delete(`/comments/${commentId}`)
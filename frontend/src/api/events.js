@@ -0,0 +1,38 @@
+// Live updates over a WebSocket. Browsers can't set headers on a WebSocket,
+// so the token goes in the query string.
+export function connectEvents(onEvent) {
+  let socket = null
+  let watched = { posts: [], authors: [] }
+  let retry = 1000
+  let closed = false
+
+  const open = () => {
+    const token = localStorage.getItem('token')
+    if (!token || closed) return
+    const scheme = window.location.protocol === 'https:' ? 'wss' : 'ws'
+    socket = new WebSocket(`${scheme}://${window.location.host}/api/events/ws?access_token=${encodeURIComponent(token)}`)
+    socket.onopen = () => {
+      retry = 1000
+      socket.send(JSON.stringify(watched))
+    }
+    socket.onmessage = (msg) => onEvent(JSON.parse(msg.data))
+    socket.onclose = () => {
+      if (closed) return
+      setTimeout(open, retry)
+      retry = Math.min(retry * 2, 30000)
+    }
+  }
+  open()
+
+  return {
+    // Replaces the whole subscription with what is on screen now
+    watch(posts, authors) {
+      watched = { posts, authors }
+      if (socket?.readyState === WebSocket.OPEN) socket.send(JSON.stringify(watched))
+    },
+    close() {
+      closed = true
+      socket?.close()
+    },
+  }
+}
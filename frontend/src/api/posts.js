@@ -1,10 +1,18 @@
 import api from './axios'
 
-export const getFeed = (skip = 0, limit = 20, following = false) =>
-  api.get('/posts/feed', { params: { skip, limit, ...(following ? { following: true } : {}) } })
+export const getFeed = (cursor = null, limit = 20, following = false, commentPreview = 0, sort = 'recent') =>
+  api.get('/posts/feed', {
+    params: {
+      limit,
+      ...(cursor ? { cursor } : {}),
+      ...(following ? { following: true } : {}),
+      ...(sort !== 'recent' ? { sort } : {}),
+      ...(commentPreview ? { include_comment_preview: commentPreview } : {}),
+    },
+  })
 
-export const getUserPosts = (username, skip = 0, limit = 20) =>
-  api.get(`/posts/user/${username}`, { params: { skip, limit } })
+export const getUserPosts = (username, cursor = null, limit = 20) =>
+  api.get(`/posts/user/${username}`, { params: { limit, ...(cursor ? { cursor } : {}) } })
 
 export const createPost = (data) => api.post('/posts', data)
 export const updatePost = (id, data) => api.put(`/posts/${id}`, data)
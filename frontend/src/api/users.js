@@ -2,4 +2,6 @@ import api from './axios'
 
 export const getProfile = (username) => api.get(`/users/${username}`)
 export const updateProfile = (data) => api.put('/users/me/profile', data)
-export const searchUsers = (q) => api.get('/users/search', { params: { q } })
+export const getSuggestions = (limit = 10) => api.get('/users/me/suggestions', { params: { limit } })
+export const searchUsers = (q, cursor = null) =>
+  api.get('/users/search', { params: { q, ...(cursor ? { cursor } : {}) } })
@@ -12,21 +12,47 @@ function timeAgo(iso) {
   return new Date(utc).toLocaleDateString('en-US', { month: 'short', day: 'numeric', year: 'numeric' })
 }
 
-export default function CommentSection({ postId, onCommentAdded, onCommentDeleted }) {
+// Appends a page, skipping comments already shown (e.g. ones we just posted)
+function mergeComments(prev, page) {
+  const seen = new Set(prev.map((c) => c.id))
+  return [...prev, ...page.filter((c) => !seen.has(c.id))]
+}
+
+export default function CommentSection({ postId, preview, onCommentAdded, onCommentDeleted }) {
   const { user } = useAuth()
-  const [comments, setComments] = useState([])
-  const [loading, setLoading] = useState(true)
+  // The feed embeds the first comments of each post, so expanding a card needs no request
+  const [comments, setComments] = useState(preview?.items ?? [])
+  const [nextCursor, setNextCursor] = useState(preview?.next_cursor ?? null)
+  const [loading, setLoading] = useState(!preview)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [content, setContent] = useState('')
   const [submitting, setSubmitting] = useState(false)
   const [error, setError] = useState(null)
   const inputRef = useRef(null)
 
   useEffect(() => {
+    if (preview) return
     getComments(postId)
-      .then((res) => setComments(res.data))
+      .then((res) => {
+        setComments(res.data.items)
+        setNextCursor(res.data.next_cursor)
+      })
       .catch(() => setComments([]))
       .finally(() => setLoading(false))
-  }, [postId])
+  }, [postId, preview])
+
+  const handleLoadMore = async () => {
+    setLoadingMore(true)
+    try {
+      const res = await getComments(postId, nextCursor)
+      setComments((prev) => mergeComments(prev, res.data.items))
+      setNextCursor(res.data.next_cursor)
+    } catch {
+      // keep what we have; the button stays so the user can retry
+    } finally {
+      setLoadingMore(false)
+    }
+  }
 
   const handleSubmit = async (e) => {
     e.preventDefault()
@@ -92,6 +118,15 @@ export default function CommentSection({ postId, onCommentAdded, onCommentDelete
               </div>
             </div>
           ))}
+          {nextCursor && (
+            <button
+              onClick={handleLoadMore}
+              disabled={loadingMore}
+              className="text-xs text-cadre-muted hover:text-white transition disabled:opacity-50"
+            >
+              {loadingMore ? 'Loading...' : 'Load more comments'}
+            </button>
+          )}
         </div>
       )}
 
@@ -1,4 +1,4 @@
-import { useState } from 'react'
+import { useEffect, useState } from 'react'
 import { Link } from 'react-router-dom'
 import { updatePost, deletePost } from '../api/posts'
 import { toggleLike } from '../api/likes'
@@ -35,6 +35,10 @@ export default function PostCard({ post, onUpdated, onDeleted }) {
   const [showComments, setShowComments] = useState(false)
   const [commentsCount, setCommentsCount] = useState(post.comments_count)
 
+  // Live events update the post in the feed; follow them here
+  useEffect(() => setLikesCount(post.likes_count), [post.likes_count])
+  useEffect(() => setCommentsCount(post.comments_count), [post.comments_count])
+
   const handleLike = async () => {
     if (liking) return
     const prevLiked = liked
@@ -205,6 +209,7 @@ export default function PostCard({ post, onUpdated, onDeleted }) {
       {showComments && (
         <CommentSection
           postId={post.id}
+          preview={post.comment_preview}
           onCommentAdded={() => setCommentsCount((n) => n + 1)}
           onCommentDeleted={() => setCommentsCount((n) => Math.max(0, n - 1))}
         />
@@ -0,0 +1,20 @@
+import { useEffect, useRef } from 'react'
+import { connectEvents } from '../api/events'
+
+// Subscribes to live events for the given posts and authors for as long as the component is mounted
+export function useLiveEvents(postIds, authorIds, onEvent) {
+  const connection = useRef(null)
+  const handler = useRef(onEvent)
+  handler.current = onEvent
+
+  useEffect(() => {
+    connection.current = connectEvents((event) => handler.current(event))
+    return () => connection.current.close()
+  }, [])
+
+  const postKey = postIds.join(',')
+  const authorKey = authorIds.join(',')
+  useEffect(() => {
+    connection.current.watch(postIds, authorIds)
+  }, [postKey, authorKey]) // eslint-disable-line react-hooks/exhaustive-deps
+}
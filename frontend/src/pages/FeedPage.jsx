@@ -1,6 +1,7 @@
 import { useEffect, useRef, useState } from 'react'
 import { createPost, getFeed } from '../api/posts'
 import { useAuth } from '../context/AuthContext'
+import { useLiveEvents } from '../hooks/useLiveEvents'
 import Navbar from '../components/Navbar'
 import PostCard from '../components/PostCard'
 
@@ -12,15 +13,56 @@ export default function FeedPage() {
   const [posting, setPosting] = useState(false)
   const [postError, setPostError] = useState(null)
   const [feedFilter, setFeedFilter] = useState('all')
+  const [feedSort, setFeedSort] = useState('recent')
+  const [incoming, setIncoming] = useState([])
+  const [reloadKey, setReloadKey] = useState(0)
   const textareaRef = useRef(null)
 
   useEffect(() => {
     setLoading(true)
     setPosts([])
-    getFeed(0, 20, feedFilter === 'following')
-      .then((res) => setPosts(res.data))
+    setIncoming([])
+    getFeed(null, 20, feedFilter === 'following', 3, feedSort)
+      .then((res) => setPosts(res.data.items))
       .finally(() => setLoading(false))
-  }, [feedFilter])
+  }, [feedFilter, feedSort, reloadKey])
+
+  const patchPost = (id, changes) =>
+    setPosts((prev) => prev.map((p) => (p.id === id ? { ...p, ...changes } : p)))
+
+  useLiveEvents(
+    posts.map((p) => p.id),
+    [...new Set(posts.map((p) => p.user_id))],
+    (event) => {
+      switch (event.type) {
+        case 'like':
+          patchPost(event.post_id, { likes_count: event.likes_count })
+          break
+        case 'comment':
+        case 'comment_deleted':
+          patchPost(event.post_id, { comments_count: event.comments_count })
+          break
+        case 'post_deleted':
+          setPosts((prev) => prev.filter((p) => p.id !== event.post_id))
+          setIncoming((prev) => prev.filter((p) => p.id !== event.post_id))
+          break
+        case 'post_created':
+          // Held back behind a button so the feed doesn't shift while reading
+          if (event.post.user_id !== user?.id) {
+            setIncoming((prev) => (prev.some((p) => p.id === event.post.id) ? prev : [event.post, ...prev]))
+          }
+          break
+        case 'resync':
+          setReloadKey((k) => k + 1)
+          break
+      }
+    },
+  )
+
+  const showIncoming = () => {
+    setPosts((prev) => [...incoming.filter((p) => !prev.some((q) => q.id === p.id)), ...prev])
+    setIncoming([])
+  }
 
   const handlePost = async (e) => {
     e.preventDefault()
@@ -72,6 +114,13 @@ export default function FeedPage() {
           >
             Following
           </button>
+          <button
+            onClick={() => setFeedSort(feedSort === 'ranked' ? 'recent' : 'ranked')}
+            className="ml-auto border border-cadre-border text-cadre-muted px-4 py-1.5 rounded text-sm hover:border-white hover:text-white transition"
+            title={feedSort === 'ranked' ? 'Showing top posts first' : 'Showing newest posts first'}
+          >
+            {feedSort === 'ranked' ? 'Top' : 'Latest'}
+          </button>
         </div>
 
         {/* Create post */}
@@ -104,6 +153,15 @@ export default function FeedPage() {
           {postError && <p className="text-cadre-red text-xs">{postError}</p>}
         </form>
 
+        {incoming.length > 0 && (
+          <button
+            onClick={showIncoming}
+            className="w-full border border-cadre-border text-cadre-muted py-2 rounded text-sm hover:border-white hover:text-white transition"
+          >
+            Show {incoming.length} new post{incoming.length === 1 ? '' : 's'}
+          </button>
+        )}
+
         {/* Feed */}
         {loading ? (
           <p className="text-center text-cadre-muted text-sm py-8">Loading feed...</p>
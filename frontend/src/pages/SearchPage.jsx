@@ -1,6 +1,6 @@
-import { useState } from 'react'
+import { useEffect, useState } from 'react'
 import { Link } from 'react-router-dom'
-import { searchUsers } from '../api/users'
+import { getSuggestions, searchUsers } from '../api/users'
 import { followUser, unfollowUser } from '../api/followers'
 import { useAuth } from '../context/AuthContext'
 import Navbar from '../components/Navbar'
@@ -11,6 +11,13 @@ export default function SearchPage() {
   const [results, setResults] = useState([])
   const [loading, setLoading] = useState(false)
   const [searched, setSearched] = useState(false)
+  const [suggestions, setSuggestions] = useState([])
+
+  useEffect(() => {
+    getSuggestions()
+      .then((res) => setSuggestions(res.data))
+      .catch(() => setSuggestions([]))
+  }, [])
 
   const handleSearch = async (e) => {
     e.preventDefault()
@@ -19,7 +26,7 @@ export default function SearchPage() {
     setSearched(true)
     try {
       const res = await searchUsers(query.trim())
-      setResults(res.data)
+      setResults(res.data.items)
     } catch {
       setResults([])
     } finally {
@@ -57,6 +64,15 @@ export default function SearchPage() {
             <UserRow key={u.id} result={u} currentUser={currentUser} />
           ))}
         </div>
+
+        {!searched && suggestions.length > 0 && (
+          <div className="space-y-3">
+            <h2 className="text-sm font-semibold text-cadre-muted">People you may know</h2>
+            {suggestions.map((u) => (
+              <UserRow key={u.id} result={u} currentUser={currentUser} />
+            ))}
+          </div>
+        )}
       </div>
     </div>
   )
@@ -92,7 +108,10 @@ function UserRow({ result, currentUser }) {
         </div>
         <div>
           <p className="text-sm font-semibold">{result.display_name || `@${result.username}`}</p>
-          <p className="text-xs text-cadre-muted">@{result.username} · {result.followers_count} followers</p>
+          <p className="text-xs text-cadre-muted">
+            @{result.username} · {result.followers_count} followers
+            {result.mutual_count > 0 && ` · followed by ${result.mutual_count} you follow`}
+          </p>
         </div>
       </Link>
       {currentUser && (